@@ -60,6 +60,15 @@ class TaskResponse(BaseModel):
     status: TaskStatus
     message: str
 
+class BatchDocumentRequest(BaseModel):
+    documents: List[DocumentRequest]
+
+class BatchTaskResponse(BaseModel):
+    task_id: str
+    task_ids: List[str]
+    status: TaskStatus
+    message: str
+
 class TaskStatusResponse(BaseModel):
     task_id: str
     status: TaskStatus
@@ -105,3 +114,20 @@ class AnnotatedDocumentResponse(BaseModel):
     status: TaskStatus
     document: Optional[DocumentRequest] = None
     error: Optional[str] = None
+
+class AnnotatedFlagsResponse(BaseModel):
+    task_id: str
+    status: TaskStatus
+    word_count: int = 0
+    flags: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
+
+class BatchAnnotatedFlagsResponse(BaseModel):
+    task_id: str
+    status: TaskStatus
+    results: List[AnnotatedFlagsResponse] = []
+
+class BatchAnnotatedDocumentsResponse(BaseModel):
+    task_id: str
+    status: TaskStatus
+    results: List[AnnotatedDocumentResponse] = []
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, HTTPException
-from typing import Dict, Optional, Any
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from typing import Dict, List, Optional, Any, Tuple, Callable
 import uuid
 from datetime import datetime
 import uvicorn
@@ -7,18 +8,46 @@ import argparse
 import redis
 import json
 import os
+import base64
+import gzip
+import time
+import asyncio
 from utils import (
     SUPPORTED_DOCUMENT_TYPES
 )
 
 from models import (
     TaskStatus, DocumentRequest, DocumentSummary,
-    TaskResponse, TaskStatusResponse, AnnotatedDocumentResponse, SummarizedDocumentResponse
+    TaskResponse, TaskStatusResponse, AnnotatedDocumentResponse, SummarizedDocumentResponse,
+    AnnotatedFlagsResponse, BatchDocumentRequest, BatchTaskResponse, BatchAnnotatedFlagsResponse,
+    BatchAnnotatedDocumentsResponse
 )
 
 from celery_tasks import annotate_document_task, summarize_document_task
 
+class GzipRequest(Request):
+    """Request whose body is transparently decompressed when sent with Content-Encoding: gzip."""
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            if "gzip" in self.headers.getlist("Content-Encoding"):
+                body = gzip.decompress(body)
+            self._body = body
+        return self._body
+
+class GzipRoute(APIRoute):
+    """Route that accepts gzip-compressed request bodies (large documents are uploaded compressed)."""
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+        
+        async def custom_route_handler(request: Request) -> Response:
+            request = GzipRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+        
+        return custom_route_handler
+
 app = FastAPI(title="JuriDoc", version="1.0.0")
+app.router.route_class = GzipRoute
 
 @app.on_event("startup")
 async def startup_event():
@@ -46,6 +75,13 @@ redis_client = redis.Redis(
 # Task cache expiration time (30 minutes)
 TASK_EXPIRATION_SECONDS = 30 * 60  # 30 minutes
 
+# Long-polling of /task-status: maximum hold time and how often Redis is re-checked meanwhile
+MAX_STATUS_WAIT_SECONDS = 30
+STATUS_WAIT_INTERVAL_SECONDS = 0.25
+
+# Word level annotation flags that can be requested from /annotated-flags
+ANNOTATION_FLAGS = ['isTemei', 'isProba', 'isSelected', 'isCerere', 'isReclamant', 'isParat']
+
 def get_task_from_redis(task_id: str) -> Optional[Dict[str, Any]]:
     """Retrieve task data from Redis."""
     try:
@@ -77,6 +113,29 @@ def save_task_to_redis(task_id: str, task_data: Dict[str, Any]):
     except Exception as e:
         print(f"Error saving task to Redis: {e}")
 
+def pack_word_flags(document: Dict[str, Any], fields: List[str]) -> Tuple[int, Dict[str, str]]:
+    """Pack the flags of every non-empty word into one base64 bitmap per field.
+
+    Bits are stored most significant first, in document word order, matching numpy.packbits.
+    """
+    words = [
+        word
+        for page in document.get('pages', [])
+        for paragraph in page.get('paragraphs', [])
+        for word in paragraph.get('words', [])
+        if word.get('text', '').strip()
+    ]
+    
+    flags = {}
+    for field in fields:
+        packed = bytearray((len(words) + 7) // 8)
+        for i, word in enumerate(words):
+            if word.get(field, False):
+                packed[i >> 3] |= 0x80 >> (i & 7)
+        flags[field] = base64.b64encode(bytes(packed)).decode('ascii')
+    
+    return len(words), flags
+
 def create_initial_task(task_id: str, document: DocumentRequest) -> None:
     initial_task_data = {
         "task_id": task_id,
@@ -89,6 +148,105 @@ def create_initial_task(task_id: str, document: DocumentRequest) -> None:
     }
     save_task_to_redis(task_id, initial_task_data)
 
+def create_batch_task(batch_id: str, task_ids: List[str]) -> None:
+    """Save a batch record that groups the tasks of several documents."""
+    now = datetime.now().isoformat()
+    save_task_to_redis(batch_id, {
+        "task_id": batch_id,
+        "task_ids": task_ids,
+        "status": TaskStatus.PENDING.value,
+        "created_at": now,
+        "updated_at": now
+    })
+
+def update_batch_task(batch_id: str, batch: Dict[str, Any], status: TaskStatus, progress: str) -> Dict[str, Any]:
+    """
+    Store the current status of a batch and renew the expiration of its record.
+    Nothing updates the batch record while its documents are processed, so without this
+    a batch taking longer than TASK_EXPIRATION_SECONDS would disappear while being polled.
+    """
+    if batch.get("status") != status.value or batch.get("progress") != progress:
+        batch = {**batch, "status": status.value, "progress": progress, "updated_at": datetime.now().isoformat()}
+        save_task_to_redis(batch_id, batch)
+    else:
+        try:
+            redis_client.expire(f"task:{batch_id}", TASK_EXPIRATION_SECONDS)
+        except Exception as e:
+            print(f"Error refreshing batch expiration in Redis: {e}")
+    return batch
+
+def get_batch_tasks_from_redis(batch: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+    """Retrieve the tasks of a batch from Redis in a single round trip, in submission order."""
+    try:
+        values = redis_client.mget([f"task:{task_id}" for task_id in batch["task_ids"]])
+        return [json.loads(value) if value else None for value in values]
+    except Exception as e:
+        print(f"Error retrieving batch tasks from Redis: {e}")
+        return [None] * len(batch["task_ids"])
+
+def parse_task_status(task: Optional[Dict[str, Any]]) -> TaskStatus:
+    """Read the status of a task record, treating missing or unknown values as failed."""
+    if not task:
+        return TaskStatus.FAILED
+    
+    try:
+        return TaskStatus(task.get("status"))
+    except ValueError:
+        return TaskStatus.FAILED
+
+def get_batch_status(tasks: List[Optional[Dict[str, Any]]]) -> Tuple[TaskStatus, str]:
+    """A batch is completed once every document has either completed or failed."""
+    statuses = [parse_task_status(task) for task in tasks]
+    finished = sum(status in (TaskStatus.COMPLETED, TaskStatus.FAILED) for status in statuses)
+    failed = statuses.count(TaskStatus.FAILED)
+    progress = f"{finished}/{len(statuses)} documents finished, {failed} failed"
+    
+    if finished == len(statuses):
+        return TaskStatus.COMPLETED, progress
+    if all(status == TaskStatus.PENDING for status in statuses):
+        return TaskStatus.PENDING, progress
+    return TaskStatus.PROCESSING, progress
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Parse the comma separated `fields` parameter of the flag endpoints (default: all flags)."""
+    requested_fields = fields.split(',') if fields else ANNOTATION_FLAGS
+    unknown_fields = [field for field in requested_fields if field not in ANNOTATION_FLAGS]
+    if unknown_fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown annotation fields: {unknown_fields}. Supported fields: {ANNOTATION_FLAGS}"
+        )
+    return requested_fields
+
+def _load_completed_batch(task_id: str) -> Tuple[Dict[str, Any], List[Optional[Dict[str, Any]]], TaskStatus]:
+    """
+    Return the batch record, its document tasks in submission order and the batch status.
+    Raises 404 for an unknown batch and 202 while documents are still being processed.
+    """
+    batch = get_task_from_redis(task_id)
+    if not batch or "task_ids" not in batch:
+        raise HTTPException(status_code=404, detail="Batch task not found")
+    
+    tasks = get_batch_tasks_from_redis(batch)
+    status, progress = get_batch_status(tasks)
+    if status != TaskStatus.COMPLETED:
+        raise HTTPException(
+            status_code=202, 
+            detail=f"Batch {status.value} not ready: {progress}."
+        )
+    return batch, tasks, status
+
+def _task_error(task: Optional[Dict[str, Any]]) -> str:
+    """Error message of a document task of a batch that did not complete."""
+    return (task or {}).get("error") or "Processing failed"
+
+def _delete_batch_from_redis(task_id: str, batch: Dict[str, Any]):
+    """Remove a batch record and its document tasks once their results have been returned."""
+    try:
+        redis_client.delete(f"task:{task_id}", *(f"task:{document_task_id}" for document_task_id in batch["task_ids"]))
+    except Exception as e:
+        print(f"Error deleting batch tasks from Redis: {e}")
+
 def update_task_status(task_id: str, status: TaskStatus, progress: Optional[str] = None, error: Optional[str] = None, document: Optional[DocumentRequest] = None, summary: Optional[DocumentSummary] = None):
     """Update task status with timestamp and optional progress/error/document/summary information."""
     task_data = get_task_from_redis(task_id)
@@ -112,6 +270,17 @@ def update_task_status(task_id: str, status: TaskStatus, progress: Optional[str]
     
     save_task_to_redis(task_id, task_data)
 
+def submit_annotation_task(document: DocumentRequest) -> str:
+    """Create the task record for a document and queue it for annotation."""
+    task_id = str(uuid.uuid4())
+    
+    create_initial_task(task_id, document)
+    update_task_status(task_id, TaskStatus.PENDING, progress="Task created")
+    
+    annotate_document_task.delay(task_id, document.dict())
+    
+    return task_id
+
 @app.post("/annotate-document", response_model=TaskResponse)
 async def annotate_document(document: DocumentRequest):
     """
@@ -124,12 +293,7 @@ async def annotate_document(document: DocumentRequest):
                    f"Supported document types: {list(SUPPORTED_DOCUMENT_TYPES.keys())}"
         )
     
-    task_id = str(uuid.uuid4())
-    
-    create_initial_task(task_id, document)
-    update_task_status(task_id, TaskStatus.PENDING, progress="Task created")
-    
-    annotate_document_task.delay(task_id, document.dict())
+    task_id = submit_annotation_task(document)
     
     return TaskResponse(
         task_id=task_id,
@@ -137,6 +301,38 @@ async def annotate_document(document: DocumentRequest):
         message="Document annotation task created successfully"
     )
 
+@app.post("/annotate-documents", response_model=BatchTaskResponse)
+async def annotate_documents(batch: BatchDocumentRequest):
+    """
+    Submit several documents for annotation at once. Returns a batch task_id
+    that can be polled through /task-status, plus the task_id of every document.
+    """
+    if not batch.documents:
+        raise HTTPException(status_code=400, detail="No documents submitted")
+    
+    unsupported_types = sorted({
+        document.documentTypeName for document in batch.documents
+        if document.documentTypeName not in SUPPORTED_DOCUMENT_TYPES
+    })
+    if unsupported_types:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Document types {unsupported_types} are not yet supported. "
+                   f"Supported document types: {list(SUPPORTED_DOCUMENT_TYPES.keys())}"
+        )
+    
+    task_ids = [submit_annotation_task(document) for document in batch.documents]
+    
+    batch_id = str(uuid.uuid4())
+    create_batch_task(batch_id, task_ids)
+    
+    return BatchTaskResponse(
+        task_id=batch_id,
+        task_ids=task_ids,
+        status=TaskStatus.PENDING,
+        message=f"Annotation tasks created successfully for {len(task_ids)} documents"
+    )
+
 @app.post("/summarize-document", response_model=TaskResponse)
 async def summarize_document(document: DocumentRequest):
     """
@@ -162,12 +358,34 @@ async def summarize_document(document: DocumentRequest):
         message="Document summarization task created successfully"
     )
 
-@app.get("/task-status/{task_id}", response_model=TaskStatusResponse)
-async def get_task_status(task_id: str):
-    """Get the current status of a processing task."""
+async def wait_for_task_completion(task_id: str, wait: float) -> Optional[Dict[str, Any]]:
+    """
+    Re-read a task from Redis until it has completed or failed, it disappears,
+    or `wait` seconds (capped at MAX_STATUS_WAIT_SECONDS) have passed.
+    """
     task = get_task_from_redis(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    deadline = time.monotonic() + min(wait, MAX_STATUS_WAIT_SECONDS)
+    
+    while (task
+           and parse_task_status(task) not in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+           and time.monotonic() < deadline):
+        await asyncio.sleep(STATUS_WAIT_INTERVAL_SECONDS)
+        task = get_task_from_redis(task_id)
+    
+    return task
+
+def build_task_status_response(task_id: str, task: Dict[str, Any]) -> TaskStatusResponse:
+    """Build the status response of a single task or a batch."""
+    if "task_ids" in task:
+        status, progress = get_batch_status(get_batch_tasks_from_redis(task))
+        task = update_batch_task(task_id, task, status, progress)
+        return TaskStatusResponse(
+            task_id=task_id,
+            status=status,
+            progress=progress,
+            created_at=task["created_at"],
+            updated_at=task["updated_at"]
+        )
     
     status = task["status"]
     if isinstance(status, str):
@@ -184,13 +402,51 @@ async def get_task_status(task_id: str):
         updated_at=task["updated_at"]
     )
 
-@app.get("/annotated-document/{task_id}", response_model=AnnotatedDocumentResponse)
-async def get_annotated_document(task_id: str):
-    """Retrieve the annotated document when processing is complete."""
+@app.get("/task-status/{task_id}", response_model=TaskStatusResponse)
+async def get_task_status(task_id: str, wait: float = 0, since: Optional[str] = None):
+    """
+    Get the current status of a processing task.
+    
+    With `wait` (seconds, capped at MAX_STATUS_WAIT_SECONDS) the request is held
+    until the status differs from `since` (default: the status at request time),
+    the task finishes, or the wait elapses. This lets clients long-poll instead
+    of issuing a request every few seconds.
+    """
     task = get_task_from_redis(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    response = build_task_status_response(task_id, task)
+    if wait <= 0:
+        return response
+    
+    since_status = since if since is not None else response.status.value
+    deadline = time.monotonic() + min(wait, MAX_STATUS_WAIT_SECONDS)
+    
+    while (response.status.value == since_status
+           and response.status not in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+           and time.monotonic() < deadline):
+        await asyncio.sleep(STATUS_WAIT_INTERVAL_SECONDS)
+        
+        task = get_task_from_redis(task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        response = build_task_status_response(task_id, task)
+    
+    return response
+
+@app.get("/annotated-document/{task_id}", response_model=AnnotatedDocumentResponse)
+async def get_annotated_document(task_id: str, wait: float = 0):
+    """
+    Retrieve the annotated document when processing is complete.
+    
+    With `wait` the request is held until the task finishes (see /task-status),
+    so the result can be fetched without polling the status first.
+    """
+    task = await wait_for_task_completion(task_id, wait) if wait > 0 else get_task_from_redis(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
     status = task["status"]
     if isinstance(status, str):
         try:
@@ -226,12 +482,140 @@ async def get_annotated_document(task_id: str):
 
     return result
 
+@app.get("/annotated-flags/{task_id}", response_model=AnnotatedFlagsResponse)
+async def get_annotated_flags(task_id: str, fields: Optional[str] = None):
+    """
+    Retrieve only the word level annotation flags when processing is complete.
+    
+    `fields` is a comma separated list of flags (default: all). Each flag is
+    returned as a base64 encoded bitmap over the non-empty words of the document.
+    """
+    requested_fields = _parse_fields(fields)
+    
+    task = get_task_from_redis(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    status = task["status"]
+    if isinstance(status, str):
+        try:
+            status = TaskStatus(status)
+        except ValueError:
+            status = TaskStatus.FAILED
+    
+    if status == TaskStatus.FAILED:
+        return AnnotatedFlagsResponse(
+            task_id=task_id,
+            status=status,
+            flags=None,
+            error=task.get("error", "Processing failed")
+        )
+    
+    if status != TaskStatus.COMPLETED:
+        raise HTTPException(
+            status_code=202, 
+            detail=f"Task {status.value if hasattr(status, 'value') else status} not ready."
+        )
+    
+    word_count, flags = pack_word_flags(task["document"], requested_fields)
+    result = AnnotatedFlagsResponse(
+        task_id=task_id,
+        status=status,
+        word_count=word_count,
+        flags=flags,
+        error=None
+    )
+
+    try:
+        redis_client.delete(f"task:{task_id}")
+    except Exception as e:
+        print(f"Error deleting task from Redis: {e}")
+
+    return result
+
+@app.get("/annotated-flags-batch/{task_id}", response_model=BatchAnnotatedFlagsResponse)
+async def get_annotated_flags_batch(task_id: str, fields: Optional[str] = None):
+    """
+    Retrieve the word level annotation flags of every document in a batch,
+    in submission order. See /annotated-flags for the format of each entry.
+    """
+    requested_fields = _parse_fields(fields)
+    
+    batch, tasks, status = _load_completed_batch(task_id)
+    
+    results = []
+    for document_task_id, task in zip(batch["task_ids"], tasks):
+        document_status = parse_task_status(task)
+        if document_status != TaskStatus.COMPLETED:
+            results.append(AnnotatedFlagsResponse(
+                task_id=document_task_id,
+                status=document_status,
+                flags=None,
+                error=_task_error(task)
+            ))
+            continue
+        
+        word_count, flags = pack_word_flags(task["document"], requested_fields)
+        results.append(AnnotatedFlagsResponse(
+            task_id=document_task_id,
+            status=document_status,
+            word_count=word_count,
+            flags=flags,
+            error=None
+        ))
+    
+    _delete_batch_from_redis(task_id, batch)
+    
+    return BatchAnnotatedFlagsResponse(
+        task_id=task_id,
+        status=status,
+        results=results
+    )
+
+@app.get("/annotated-documents/{task_id}", response_model=BatchAnnotatedDocumentsResponse)
+async def get_annotated_documents(task_id: str):
+    """
+    Retrieve the annotated documents of a batch, in submission order.
+    See /annotated-document for the format of each entry.
+    """
+    batch, tasks, status = _load_completed_batch(task_id)
+    
+    results = []
+    for document_task_id, task in zip(batch["task_ids"], tasks):
+        document_status = parse_task_status(task)
+        if document_status != TaskStatus.COMPLETED:
+            results.append(AnnotatedDocumentResponse(
+                task_id=document_task_id,
+                status=document_status,
+                document=None,
+                error=_task_error(task)
+            ))
+            continue
+        
+        results.append(AnnotatedDocumentResponse(
+            task_id=document_task_id,
+            status=document_status,
+            document=task["document"],
+            error=None
+        ))
+    
+    _delete_batch_from_redis(task_id, batch)
+    
+    return BatchAnnotatedDocumentsResponse(
+        task_id=task_id,
+        status=status,
+        results=results
+    )
+
 @app.get("/summarized-document/{task_id}", response_model=SummarizedDocumentResponse)
-async def get_summarized_document(task_id: str):
+async def get_summarized_document(task_id: str, wait: float = 0):
     """
     Retrieve the summarized document when processing is complete.
+    
+    With `wait` the request is held until the task finishes (see /task-status),
+    so the result can be fetched without polling the status first.
     """
-    task = get_task_from_redis(task_id)
+    task = await wait_for_task_completion(task_id, wait) if wait > 0 else get_task_from_redis(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
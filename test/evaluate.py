@@ -1,17 +1,31 @@
 #!/usr/bin/env python3
 import json
 import os
+import base64
+import hashlib
+import tempfile
 import argparse
 from pathlib import Path
 from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 import time
+import logging
 from datetime import datetime
+from itertools import compress
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
+
+def _popcount(bits: np.ndarray) -> int:
+    """Count the set bits of a packed uint8 array."""
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return int(np.bitwise_count(bits).sum())
+    return int(np.unpackbits(bits).sum())
+
 
 @dataclass
 class EvaluationResult:
@@ -44,33 +58,43 @@ class DocumentEvaluator:
     #ENTITY_TYPES = ['isTemei', 'isCerere', 'isProba', 'isSelected', 'isReclamant', 'isParat'] 
     ENTITY_TYPES = ['isSelected'] 
     
-    def __init__(self, server_url: str, document_type: str = 'subpoena', timeout: int = 300, max_workers: int = 3):
+    def __init__(self, server_url: str, document_type: str = 'subpoena', timeout: int = 300, max_workers: int = 3, cache_dir: Optional[str] = None, batch_size: int = 1):
         self.server_url = server_url
         self.document_type = document_type
         self.timeout = timeout
         self.max_workers = max_workers
+        self.batch_size = max(1, batch_size)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entity_types_tuple = tuple(self.ENTITY_TYPES)
+    
+    def _load_one(self, json_file: Path) -> Optional[Dict[str, Any]]:
+        """Load a single validation file, returning None if it cannot be decoded."""
+        try:
+            data = json.loads(json_file.read_bytes())
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Error loading {json_file}: {e}")
+            return None
+        
+        data['filename'] = json_file.name
+        return data
     
     def load_validation_data(self, validation_dir: str) -> List[Dict[str, Any]]:
         validation_path = Path(validation_dir)
         if not validation_path.exists():
             raise FileNotFoundError(f"Validation directory not found: {validation_dir}")
         
-        validation_data = []
         json_files = list(validation_path.glob("*.json"))
         
-        print(f"Found {len(json_files)} validation files")
+        logger.info(f"Found {len(json_files)} validation files")
         
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    data['filename'] = json_file.name
-                    validation_data.append(data)
-            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                print(f"Error loading {json_file}: {e}")
-                continue
-                
-        return validation_data
+        # File reads are I/O bound, so a thread pool overlaps the open/read latency
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = list(executor.map(self._load_one, json_files))
+        
+        return [data for data in loaded if data is not None]
     
     def prepare_document_for_processing(self, validation_doc: Dict[str, Any], extraction_types: List[str] = None) -> Dict[str, Any]:
         import copy
@@ -98,7 +122,107 @@ class DocumentEvaluator:
         
         return document
     
-    def process_document_with_server(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _cache_path(self, document: Dict[str, Any]) -> Optional[Path]:
+        """Cache file for a prepared document, keyed by the server URL and the hash of its canonical JSON."""
+        if self.cache_dir is None:
+            return None
+        
+        canonical = json.dumps({'server_url': self.server_url, 'fields': self.ENTITY_TYPES, 'document': document}, sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json"
+    
+    def _read_cache(self, cache_path: Optional[Path]) -> Optional[Dict[str, np.ndarray]]:
+        """Return the cached word flags for a document, or None on a cache miss."""
+        if cache_path is None or not cache_path.exists():
+            return None
+        
+        try:
+            return self.unpack_word_flags(json.loads(cache_path.read_bytes()))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {cache_path}: {e}")
+            return None
+    
+    def _write_cache(self, cache_path: Optional[Path], flags_response: Dict[str, Any]):
+        if cache_path is None:
+            return
+        
+        # Write to a uniquely named temporary file and rename it, so concurrent writers of the
+        # same entry never share a file and readers never see a partial entry. The cache is
+        # best-effort, a failed write must not discard the server predictions
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as temp_file:
+                temp_path = temp_file.name
+                temp_file.write(json.dumps(flags_response).encode('utf-8'))
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {cache_path}: {e}")
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+    
+    def process_document_with_server(self, document: Dict[str, Any]) -> Optional[Dict[str, np.ndarray]]:
+        """Annotate a document on the server and return its predicted word flags per entity type."""
+        return self.process_documents_with_server([document])[0]
+    
+    def process_documents_with_server(self, documents: List[Dict[str, Any]]) -> List[Optional[Dict[str, np.ndarray]]]:
+        """Annotate documents on the server, returning their predicted word flags in input order.
+        
+        Cached documents are not resubmitted. Several uncached documents are sent as one batch.
+        """
+        cache_paths = [self._cache_path(document) for document in documents]
+        predictions = [self._read_cache(cache_path) for cache_path in cache_paths]
+        
+        pending = [i for i, prediction in enumerate(predictions) if prediction is None]
+        if not pending:
+            return predictions
+        
+        if len(pending) == 1:
+            flags_responses = [self.request_word_flags(documents[pending[0]])]
+        else:
+            flags_responses = self.request_word_flags_batch([documents[i] for i in pending])
+        
+        for i, flags_response in zip(pending, flags_responses):
+            if flags_response is None or flags_response.get('flags') is None:
+                continue
+            
+            self._write_cache(cache_paths[i], flags_response)
+            predictions[i] = self.unpack_word_flags(flags_response)
+        
+        return predictions
+    
+    def _wait_for_task(self, task_id: str, max_polls: int = 60) -> bool:
+        """Poll /task-status until the task completes. Returns False if it fails or times out."""
+        poll_interval = 5
+        
+        for _ in range(max_polls):
+            status_response = requests.get(
+                f"{self.server_url}/task-status/{task_id}",
+                timeout=120
+            )
+            
+            if status_response.status_code != 200:
+                logger.error(f"Error checking task status of {task_id}: {status_response.status_code} ({status_response.text})")
+                return False
+            
+            status_data = status_response.json()
+            status = status_data['status']
+            
+            if status == 'completed':
+                return True
+            elif status == 'failed':
+                logger.error(f"Task failed: {task_id}")
+                return False
+            
+            time.sleep(poll_interval)
+        
+        logger.error(f"Task timed out: {task_id}")
+        return False
+    
+    def request_word_flags(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Submit a document for annotation and return the /annotated-flags response."""
         try:
             response = requests.post(
                 f"{self.server_url}/annotate-document",
@@ -107,172 +231,195 @@ class DocumentEvaluator:
             )
             
             if response.status_code != 200:
-                print(f"Error submitting document: {response.status_code}")
+                logger.error(f"Error submitting document: {response.status_code} ({response.text})")
                 return None
             
             task_response = response.json()
             task_id = task_response['task_id']
             
-            max_polls = 60  # 5 minutes with 5-second intervals
-            poll_interval = 5
-            
-            for _ in range(max_polls):
-                status_response = requests.get(
-                    f"{self.server_url}/task-status/{task_id}",
-                    timeout=120
-                )
-                
-                if status_response.status_code != 200:
-                    print(f"Error checking task status: {status_response.status_code}")
-                    return None
-                
-                status_data = status_response.json()
-                status = status_data['status']
-                
-                if status == 'completed':
-                    break
-                elif status == 'failed':
-                    print(f"Task failed: {task_id}")
-                    return None
-                
-                time.sleep(poll_interval)
-            else:
-                print(f"Task timed out: {task_id}")
+            if not self._wait_for_task(task_id):
                 return None
             
+            # Only the packed word flags are needed for scoring, not the whole annotated document
             result_response = requests.get(
-                f"{self.server_url}/annotated-document/{task_id}",
+                f"{self.server_url}/annotated-flags/{task_id}",
+                params={'fields': ','.join(self.ENTITY_TYPES)},
                 timeout=120
             )
             
             if result_response.status_code != 200:
-                print(f"Error retrieving annotated document: {result_response.status_code}")
+                logger.error(f"Error retrieving annotation flags: {result_response.status_code} ({result_response.text})")
                 return None
             
             result = result_response.json()
-            return result.get('document')
+            if result.get('flags') is None:
+                logger.error(f"Task failed: {task_id} ({result.get('error')})")
+            return result
             
         except Exception as e:
-            print(f"Error processing document: {e}")
+            logger.error(f"Error processing document: {e}")
             return None
     
-    def extract_word_annotations(self, document: Dict[str, Any]) -> Dict[str, List[bool]]:
-        word_annotations = {entity_type: [] for entity_type in self.ENTITY_TYPES}
-        
-        if not document or 'pages' not in document:
-            return word_annotations
+    def request_word_flags_batch(self, documents: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Submit documents as one batch and return their /annotated-flags responses in input order."""
+        failed = [None] * len(documents)
         
-        for page in document['pages']:
-            for paragraph in page.get('paragraphs', []):
-                for word in paragraph.get('words', []):
-                    word_text = word.get('text', '').strip()
-                    if not word_text:
-                        continue
-                    
-                    for entity_type in self.ENTITY_TYPES:
-                        is_annotated = word.get(entity_type, False)
-                        word_annotations[entity_type].append(is_annotated)
+        try:
+            response = requests.post(
+                f"{self.server_url}/annotate-documents",
+                json={'documents': documents},
+                timeout=self.timeout
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"Error submitting batch of {len(documents)} documents: {response.status_code}")
+                return failed
+            
+            task_id = response.json()['task_id']
+            
+            # The documents of a batch are annotated concurrently, allow one single-document timeout per document
+            if not self._wait_for_task(task_id, max_polls=60 * len(documents)):
+                return failed
+            
+            result_response = requests.get(
+                f"{self.server_url}/annotated-flags-batch/{task_id}",
+                params={'fields': ','.join(self.ENTITY_TYPES)},
+                timeout=120
+            )
+            
+            if result_response.status_code != 200:
+                logger.error(f"Error retrieving batch annotation flags: {result_response.status_code}")
+                return failed
+            
+            results = result_response.json()['results']
+            for result in results:
+                if result.get('flags') is None:
+                    logger.error(f"Task failed: {result['task_id']} ({result.get('error')})")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error processing batch: {e}")
+            return failed
+    
+    def unpack_word_flags(self, flags_response: Dict[str, Any]) -> Optional[Dict[str, np.ndarray]]:
+        """Decode the base64 bitmaps returned by /annotated-flags into boolean arrays."""
+        flags = flags_response.get('flags')
+        if flags is None:
+            return None
         
-        return word_annotations
+        word_count = flags_response.get('word_count', 0)
+        return {
+            entity_type: np.unpackbits(np.frombuffer(base64.b64decode(packed), dtype=np.uint8), count=word_count).astype(bool)
+            for entity_type, packed in flags.items()
+        }
     
-    def extract_annotated_words(self, document: Dict[str, Any]) -> Dict[str, List[str]]:
-        """Extract the actual words that are annotated for each entity type."""
-        annotated_words = {entity_type: [] for entity_type in self.ENTITY_TYPES}
+    def flatten_document(self, document: Dict[str, Any]) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Walk the document once, returning the non-empty word texts and one flag array per entity type."""
+        entity_types = self._entity_types_tuple
+        word_texts = []
+        word_flags = []
         
-        if not document or 'pages' not in document:
-            return annotated_words
-        
-        for page in document['pages']:
-            for paragraph in page.get('paragraphs', []):
-                for word in paragraph.get('words', []):
-                    word_text = word.get('text', '').strip()
-                    if not word_text:
-                        continue
-                    
-                    for entity_type in self.ENTITY_TYPES:
-                        is_annotated = word.get(entity_type, False)
-                        if is_annotated:
-                            annotated_words[entity_type].append(word_text)
-        
-        return annotated_words
+        if document and 'pages' in document:
+            for page in document['pages']:
+                for paragraph in page.get('paragraphs', []):
+                    for word in paragraph.get('words', []):
+                        word_text = word.get('text', '').strip()
+                        if not word_text:
+                            continue
+                        
+                        word_texts.append(word_text)
+                        word_flags.append(tuple(word.get(entity_type, False) for entity_type in entity_types))
+        
+        flags_matrix = np.array(word_flags, dtype=bool).reshape(len(word_flags), len(entity_types))
+        return word_texts, {entity_type: flags_matrix[:, i] for i, entity_type in enumerate(entity_types)}
     
     def document_has_entity_annotations(self, document: Dict[str, Any], entity_types: List[str]) -> bool:
         """Check if document has any annotations for the specified entity types."""
         if not document or 'pages' not in document:
             return False
         
-        for page in document['pages']:
-            for paragraph in page.get('paragraphs', []):
-                for word in paragraph.get('words', []):
-                    word_text = word.get('text', '').strip()
-                    if not word_text:
-                        continue
-                    
-                    for entity_type in entity_types:
-                        if word.get(entity_type, False):
-                            return True
+        entity_type_set = frozenset(entity_types)
         
-        return False
+        return any(
+            word.get(entity_type, False)
+            for page in document['pages']
+            for paragraph in page.get('paragraphs', ())
+            for word in paragraph.get('words', ())
+            if word.get('text', '').strip()
+            for entity_type in entity_type_set
+        )
     
     def _extract_document_text(self, document: Dict[str, Any]) -> str:
         """Extract the full text content from a document for display purposes."""
         if 'pages' not in document:
             return ""
         
-        full_text = []
-        for page in document['pages']:
-            page_text = []
-            for paragraph in page.get('paragraphs', []):
-                paragraph_text = []
-                for word in paragraph.get('words', []):
-                    word_text = word.get('text', '')
-                    if word_text:
-                        paragraph_text.append(word_text)
-                if paragraph_text:
-                    page_text.append(' '.join(paragraph_text))
-            if page_text:
-                full_text.append('\n'.join(page_text))
-        
-        return '\n\n'.join(full_text)
+        page_texts = (
+            '\n'.join(filter(None, (
+                ' '.join(filter(None, (word.get('text', '') for word in paragraph.get('words', []))))
+                for paragraph in page.get('paragraphs', [])
+            )))
+            for page in document['pages']
+        )
+        
+        return '\n\n'.join(filter(None, page_texts))
     
     def process_single_document(self, validation_doc: Dict[str, Any], doc_index: int, total_docs: int, extraction_types: List[str] = None) -> Tuple[int, Optional[Dict[str, Dict[str, Any]]], str, Optional[Dict[str, Any]]]:
         """Process a single document and return its evaluation results."""
-        filename = validation_doc.get('filename', 'unknown')
+        return self.process_document_batch([validation_doc], doc_index, total_docs, extraction_types)[0]
+    
+    def process_document_batch(self, validation_docs: List[Dict[str, Any]], start_index: int, total_docs: int, extraction_types: List[str] = None) -> List[Tuple[int, Optional[Dict[str, Dict[str, Any]]], str, Optional[Dict[str, Any]]]]:
+        """Process consecutive documents in one server round trip and return their evaluation results."""
+        if extraction_types is None:
+            extraction_types = self.ENTITY_TYPES
         
         try:
-            if extraction_types is None:
-                extraction_types = self.ENTITY_TYPES
-            
-            print(f"Processing document {doc_index + 1}/{total_docs}: {filename}")
-            
-            document = self.prepare_document_for_processing(validation_doc, extraction_types)
-            
-            processed_doc = self.process_document_with_server(document)
+            for offset, validation_doc in enumerate(validation_docs):
+                logger.debug(f"Processing document {start_index + offset + 1}/{total_docs}: {validation_doc.get('filename', 'unknown')}")
             
-            if processed_doc is None:
-                print(f"Failed to process document: {filename}")
+            documents = [self.prepare_document_for_processing(validation_doc, extraction_types) for validation_doc in validation_docs]
+            predictions = self.process_documents_with_server(documents)
+        except Exception as e:
+            logger.error(f"Error processing documents {start_index + 1}-{start_index + len(validation_docs)}: {e}")
+            predictions = [None] * len(validation_docs)
+        
+        return [
+            self.score_document(validation_doc, predicted_annotations, start_index + offset, total_docs, extraction_types)
+            for offset, (validation_doc, predicted_annotations) in enumerate(zip(validation_docs, predictions))
+        ]
+    
+    def score_document(self, validation_doc: Dict[str, Any], predicted_annotations: Optional[Dict[str, np.ndarray]], doc_index: int, total_docs: int, extraction_types: List[str]) -> Tuple[int, Optional[Dict[str, Dict[str, Any]]], str, Optional[Dict[str, Any]]]:
+        """Evaluate the server prediction for one document."""
+        filename = validation_doc.get('filename', 'unknown')
+        
+        try:
+            if predicted_annotations is None:
+                logger.warning(f"Failed to process document: {filename}")
                 return doc_index, None, filename, None
             
-            doc_results = self.evaluate_document_pair(validation_doc, processed_doc)
+            doc_results = self.evaluate_document_pair(validation_doc, predicted_annotations)
             
             detailed_result = {
                 "filename": filename,
-                "request_text": self._extract_document_text(validation_doc),
+                # request_text is only built from the source document when results are saved
+                "request_text": None,
+                "source_document": validation_doc,
                 "extraction_types": extraction_types,
                 "metrics": doc_results
             }
             
-            print(f"Document {filename} results:")
-            for entity_type in extraction_types:
-                if entity_type in doc_results:
-                    metrics = doc_results[entity_type]
-                    print(f"  {entity_type}: Recall={metrics['recall_percentage']:.1f}%, Extra={metrics['extra_annotations_count']} ({metrics['extra_annotations_percentage']:.1f}%), F1={metrics['f1_score']:.3f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Document {filename} results:")
+                for entity_type in extraction_types:
+                    if entity_type in doc_results:
+                        metrics = doc_results[entity_type]
+                        logger.debug(f"  {entity_type}: Recall={metrics['recall_percentage']:.1f}%, Extra={metrics['extra_annotations_count']} ({metrics['extra_annotations_percentage']:.1f}%), F1={metrics['f1_score']:.3f}")
             
-            print(f"Successfully processed document {doc_index + 1}/{total_docs}: {filename}")
+            logger.debug(f"Successfully processed document {doc_index + 1}/{total_docs}: {filename}")
             return doc_index, doc_results, filename, detailed_result
             
         except Exception as e:
-            print(f"Error processing document {filename}: {e}")
+            logger.error(f"Error processing document {filename}: {e}")
             return doc_index, None, filename, None
     
     def calculate_word_level_metrics(self, ground_truth_annotations: List[bool], predicted_annotations: List[bool]) -> Dict[str, float]:
@@ -280,39 +427,37 @@ class DocumentEvaluator:
         Calculate word-level precision, recall, and F1 score.
         
         Args:
-            ground_truth_annotations: List of boolean values for ground truth
-            predicted_annotations: List of boolean values for predictions
+            ground_truth_annotations: Sequence of boolean values for ground truth
+            predicted_annotations: Sequence of boolean values for predictions
         """
         if len(ground_truth_annotations) != len(predicted_annotations):
-            print(f"Warning: Mismatched annotation lengths: {len(ground_truth_annotations)} vs {len(predicted_annotations)}")
+            logger.warning(f"Mismatched annotation lengths: {len(ground_truth_annotations)} vs {len(predicted_annotations)}")
             min_len = min(len(ground_truth_annotations), len(predicted_annotations))
             ground_truth_annotations = ground_truth_annotations[:min_len]
             predicted_annotations = predicted_annotations[:min_len]
         
-        if not ground_truth_annotations:
+        if len(ground_truth_annotations) == 0:
             return {
                 'precision': 0.0, 'recall': 0.0, 'f1_score': 0.0,
                 'total_words': 0, 'gt_positive_words': 0, 'pred_positive_words': 0,
                 'recall_percentage': 0.0, 'extra_annotations_count': 0, 'extra_annotations_percentage': 0.0
             }
         
-        tp = fp = fn = 0
+        # Pack 8 words per byte, so tp/fp/fn are popcounts of bitwise masks. The zero padding never counts.
+        gt_bits = np.packbits(np.asarray(ground_truth_annotations, dtype=bool))
+        pred_bits = np.packbits(np.asarray(predicted_annotations, dtype=bool))
         
-        for gt, pred in zip(ground_truth_annotations, predicted_annotations):
-            if gt and pred:
-                tp += 1
-            elif not gt and pred:
-                fp += 1
-            elif gt and not pred:
-                fn += 1
+        tp = _popcount(gt_bits & pred_bits)
+        fp = _popcount(~gt_bits & pred_bits)
+        fn = _popcount(gt_bits & ~pred_bits)
         
         precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
         recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
         f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
         
         total_words = len(ground_truth_annotations)
-        gt_positive_words = sum(ground_truth_annotations)
-        pred_positive_words = sum(predicted_annotations)
+        gt_positive_words = tp + fn
+        pred_positive_words = tp + fp
         
         recall_percentage = (tp / gt_positive_words * 100) if gt_positive_words > 0 else 0.0
         
@@ -331,70 +476,75 @@ class DocumentEvaluator:
             'extra_annotations_percentage': extra_annotations_percentage
         }
     
-    def evaluate_document_pair(self, ground_truth_doc: Dict[str, Any], predicted_doc: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    def evaluate_document_pair(self, ground_truth_doc: Dict[str, Any], predicted_annotations: Dict[str, np.ndarray]) -> Dict[str, Dict[str, Any]]:
+        """Score predicted word flags against the annotations of the ground truth document."""
         results = {}
         
-        gt_annotations = self.extract_word_annotations(ground_truth_doc)
-        pred_annotations = self.extract_word_annotations(predicted_doc)
-        
-        gt_annotated_words = self.extract_annotated_words(ground_truth_doc)
-        pred_annotated_words = self.extract_annotated_words(predicted_doc)
+        # The server keeps the word sequence intact, so predicted words are read from the ground truth text
+        word_texts, gt_annotations = self.flatten_document(ground_truth_doc)
 
         for entity_type in self.ENTITY_TYPES:
-            gt_words = gt_annotations.get(entity_type, [])
-            pred_words = pred_annotations.get(entity_type, [])
+            gt_flags = gt_annotations[entity_type]
+            pred_flags = predicted_annotations.get(entity_type, np.zeros(0, dtype=bool))
             
-            metrics = self.calculate_word_level_metrics(gt_words, pred_words)
+            metrics = self.calculate_word_level_metrics(gt_flags, pred_flags)
             
-            metrics['ground_truth_words'] = ' '.join(gt_annotated_words.get(entity_type, []))
-            metrics['predicted_words'] = ' '.join(pred_annotated_words.get(entity_type, []))
+            metrics['ground_truth_words'] = ' '.join(compress(word_texts, gt_flags))
+            metrics['predicted_words'] = ' '.join(compress(word_texts, pred_flags))
             
             results[entity_type] = metrics
         
         return results
     
+    # Per-document metric keys, in the column order used by aggregate_metrics
+    METRIC_KEYS = (
+        'precision', 'recall', 'f1_score',
+        'total_words', 'gt_positive_words', 'pred_positive_words',
+        'recall_percentage', 'extra_annotations_count', 'extra_annotations_percentage'
+    )
+    
     def aggregate_metrics(self, all_document_results: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
         """Aggregate metrics across all documents."""
         aggregated = {}
+        column = {key: i for i, key in enumerate(self.METRIC_KEYS)}
         
         for entity_type in self.ENTITY_TYPES:
-            all_metrics = {
-                'precision': [], 'recall': [], 'f1_score': [],
-                'total_words': [], 'gt_positive_words': [], 'pred_positive_words': [],
-                'recall_percentage': [], 'extra_annotations_count': [], 'extra_annotations_percentage': []
-            }
-            
-            for doc_result in all_document_results:
-                if entity_type in doc_result:
-                    metrics = doc_result[entity_type]
-                    for key in all_metrics:
-                        if key in metrics and isinstance(metrics[key], (int, float)):
-                            all_metrics[key].append(metrics[key])
+            rows = [
+                [doc_result[entity_type].get(key, 0) for key in self.METRIC_KEYS]
+                for doc_result in all_document_results
+                if entity_type in doc_result
+            ]
             
             entity_aggregated = {}
             
-            if all_metrics['precision']:
+            if rows:
+                metrics_matrix = np.array(rows, dtype=np.float64)
+                means = metrics_matrix.mean(axis=0)
+                sums = metrics_matrix.sum(axis=0)
+                
                 entity_aggregated = {
-                    'avg_precision': np.mean(all_metrics['precision']),
-                    'avg_recall': np.mean(all_metrics['recall']),
-                    'avg_f1_score': np.mean(all_metrics['f1_score']),
-                    'total_words': np.sum(all_metrics['total_words']),
-                    'total_gt_positive': np.sum(all_metrics['gt_positive_words']),
-                    'total_pred_positive': np.sum(all_metrics['pred_positive_words']),
-                    'avg_recall_percentage': np.mean(all_metrics['recall_percentage']),
-                    'total_extra_annotations': np.sum(all_metrics['extra_annotations_count']),
-                    'avg_extra_percentage': np.mean(all_metrics['extra_annotations_percentage']),
-                    'num_documents': len(all_metrics['precision'])
+                    'avg_precision': means[column['precision']],
+                    'avg_recall': means[column['recall']],
+                    'avg_f1_score': means[column['f1_score']],
+                    'total_words': int(sums[column['total_words']]),
+                    'total_gt_positive': int(sums[column['gt_positive_words']]),
+                    'total_pred_positive': int(sums[column['pred_positive_words']]),
+                    'avg_recall_percentage': means[column['recall_percentage']],
+                    'total_extra_annotations': int(sums[column['extra_annotations_count']]),
+                    'avg_extra_percentage': means[column['extra_annotations_percentage']],
+                    'num_documents': len(rows)
                 }
                 
             aggregated[entity_type] = entity_aggregated
         
         return aggregated
     
-    def evaluate_all_documents(self, validation_dir: str, extraction_types: List[str] = None) -> EvaluationResult:
+    def evaluate_all_documents(self, validation_dir: Optional[str] = None, extraction_types: List[str] = None, validation_data: Optional[List[Dict[str, Any]]] = None) -> EvaluationResult:
+        """Evaluate documents from validation_dir, or the already loaded validation_data if given."""
         start_time = time.time()
         
-        validation_data = self.load_validation_data(validation_dir)
+        if validation_data is None:
+            validation_data = self.load_validation_data(validation_dir)
         
         if extraction_types is None:
             extraction_types = self.ENTITY_TYPES
@@ -408,25 +558,27 @@ class DocumentEvaluator:
         
         skipped_count = original_count - total_documents
         if skipped_count > 0:
-            print(f"Filtered {original_count} -> {total_documents} documents (skipped {skipped_count} without {extraction_types} annotations)")
+            logger.info(f"Filtered {original_count} -> {total_documents} documents (skipped {skipped_count} without {extraction_types} annotations)")
         else:
-            print(f"Processing {total_documents} documents")
+            logger.info(f"Processing {total_documents} documents")
         
         all_document_results = []
         detailed_results = []
         successful_predictions = 0
         failed_predictions = 0
         
-        print(f"Processing {total_documents} documents with {self.max_workers} parallel workers...")
+        logger.info(f"Processing {total_documents} documents with {self.max_workers} parallel workers in batches of {self.batch_size}...")
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_doc = {
-                executor.submit(self.process_single_document, validation_doc, i, total_documents, extraction_types): i 
-                for i, validation_doc in enumerate(validation_data)
-            }
+            futures = [
+                executor.submit(self.process_document_batch, validation_data[i:i + self.batch_size], i, total_documents, extraction_types)
+                for i in range(0, total_documents, self.batch_size)
+            ]
             
-            for future in as_completed(future_to_doc):
-                doc_index, doc_results, filename, detailed_result = future.result()
+            batch_results = (result for future in as_completed(futures) for result in future.result())
+            for completed_count, (doc_index, doc_results, filename, detailed_result) in enumerate(batch_results, 1):
+                # Progress is reported from this thread only, the workers log per document details at DEBUG
+                logger.info(f"Completed {completed_count}/{total_documents} documents")
                 
                 if doc_results is not None:
                     all_document_results.append(doc_results)
@@ -446,15 +598,13 @@ class DocumentEvaluator:
                     detailed_results.append(detailed_result)
                     failed_predictions += 1
         
-        print("Aggregating results...")
+        logger.info("Aggregating results...")
         entity_metrics = self.aggregate_metrics(all_document_results)
         
-        all_f1_scores = []
-        for doc_result in all_document_results:
-            for entity_type, metrics in doc_result.items():
-                all_f1_scores.append(metrics['f1_score'])
-        
-        overall_accuracy = np.mean(all_f1_scores) if all_f1_scores else 0.0
+        # Mean F1 over every (document, entity type) pair, recovered from the per-entity averages
+        f1_sum = sum(m['avg_f1_score'] * m['num_documents'] for m in entity_metrics.values() if m)
+        f1_count = sum(m['num_documents'] for m in entity_metrics.values() if m)
+        overall_accuracy = f1_sum / f1_count if f1_count else 0.0
         
         evaluation_time = time.time() - start_time
         
@@ -514,6 +664,16 @@ class DocumentEvaluator:
         results_dict['timestamp'] = datetime.now().isoformat()
         results_dict['document_type'] = self.document_type
         
+        if 'detailed_results' in results_dict:
+            detailed_results = []
+            for detailed_result in results_dict['detailed_results']:
+                detailed_result = dict(detailed_result)
+                source_document = detailed_result.pop('source_document', None)
+                if source_document is not None:
+                    detailed_result['request_text'] = self._extract_document_text(source_document)
+                detailed_results.append(detailed_result)
+            results_dict['detailed_results'] = detailed_results
+        
         def convert_numpy_types(obj):
             """Recursively convert NumPy types to Python native types."""
             if isinstance(obj, np.integer):
@@ -532,10 +692,9 @@ class DocumentEvaluator:
         
         results_dict = convert_numpy_types(results_dict)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results_dict, f, indent=2, ensure_ascii=False)
+        Path(output_file).write_bytes(json.dumps(results_dict, indent=2, ensure_ascii=False).encode('utf-8'))
         
-        print(f"Results saved to: {output_file}")
+        logger.info(f"Results saved to: {output_file}")
 
 
 def main():
@@ -562,12 +721,26 @@ def main():
     parser.add_argument("--max-workers", "-w", 
                        type=int, default=1,
                        help="Maximum number of parallel workers for document processing")
+    parser.add_argument("--batch-size", "-b", 
+                       type=int, default=8,
+                       help="Number of documents submitted to the server per request (1 disables batch submission)")
+    parser.add_argument("--cache-dir", 
+                       default=None,
+                       help="Directory where server results are cached between runs, keyed by server URL and document hash. "
+                            "Disabled by default; clear it when the model behind the server changes")
+    parser.add_argument("--verbose", 
+                       action="store_true",
+                       help="Log the progress and metrics of every document")
     parser.add_argument("--extraction-types", "-e", 
                        nargs='*', default=None,
                        help="Specific entity types to extract and evaluate (default: all)")
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    
     if args.validation_dir is None:
         if args.type == "subpoena":
             args.validation_dir = "../train/subpoena_validation"
@@ -593,7 +766,9 @@ def main():
         server_url=args.server_url, 
         document_type=args.type,
         timeout=args.timeout, 
-        max_workers=args.max_workers
+        max_workers=args.max_workers,
+        batch_size=args.batch_size,
+        cache_dir=args.cache_dir
     )
     
     try:
@@ -612,16 +787,7 @@ def main():
                 limited_data = valid_docs[:args.limit]
                 print(f"Selected {len(limited_data)} documents with relevant annotations from {len(validation_data)} total documents.")
             
-            import tempfile
-            
-            with tempfile.TemporaryDirectory() as temp_dir:
-                for doc in limited_data:
-                    filename = doc.get('filename', 'unknown.json')
-                    temp_file = os.path.join(temp_dir, filename)
-                    with open(temp_file, 'w', encoding='utf-8') as f:
-                        json.dump(doc, f, ensure_ascii=False, indent=2)
-                
-                results = evaluator.evaluate_all_documents(temp_dir, args.extraction_types)
+            results = evaluator.evaluate_all_documents(extraction_types=args.extraction_types, validation_data=limited_data)
         else:
             results = evaluator.evaluate_all_documents(args.validation_dir, args.extraction_types)
         
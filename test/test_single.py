@@ -1,10 +1,150 @@
 #!/usr/bin/env python3
 
-import json
 import argparse
 import sys
+import time
+import gzip
+import orjson
 from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Optional
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+# Maximum number of documents processed concurrently when several are given
+MAX_CONCURRENT_DOCUMENTS = 16
+
+# One pooled session for every call, so the status polling reuses kept-alive connections;
+# the pool is large enough for one connection per concurrently processed document
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENT_DOCUMENTS))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENT_DOCUMENTS))
+
+ANNOTATION_TYPES = ('isTemei', 'isProba', 'isSelected', 'isCerere', 'isReclamant', 'isParat')
+
+ANNOTATION_TO_SUMMARY_FIELD = MappingProxyType({
+    'isTemei': 'Temei',
+    'isProba': 'Proba', 
+    'isSelected': 'Selected',
+    'isCerere': 'Cerere',
+    'isReclamant': 'Reclamant',
+    'isParat': 'Parat'
+})
+
+CATEGORY_NAMES = MappingProxyType({
+    'isTemei': 'Temeiul Legal',
+    'isProba': 'Probele și Dovezile',
+    'isSelected': 'Descrierea Faptelor',
+    'isCerere': 'Cererea',
+    'isReclamant': 'Reclamantul',
+    'isParat': 'Pârâtul'
+})
+
+# Adaptive status polling: start fast, back off while the status is unchanged
+MIN_POLL_INTERVAL = 0.5
+MAX_POLL_INTERVAL = 5.0
+POLL_BACKOFF = 1.5
+# Seconds the server may hold a status request open waiting for a status change
+LONG_POLL_WAIT = 25.0
+
+def _gzip_json_body(document: dict) -> bytes:
+    """Serialize a document to a gzip-compressed JSON request body."""
+    return gzip.compress(orjson.dumps(document))
+
+def get_session() -> requests.Session:
+    """Return the HTTP session used for all server requests."""
+    return _SESSION
+
+def _poll_until_done(session: requests.Session, status_url: str, deadline: float) -> bool:
+    """
+    Long-poll a task status URL until the task completes. Returns False on failure, error or timeout.
+    
+    The server holds each request until the status changes; if it answers early with an
+    unchanged status (a server without long-polling) we fall back to backoff sleeping.
+    """
+    interval = MIN_POLL_INTERVAL
+    last_status = None
+    poll_count = 0
+    
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        
+        wait = min(LONG_POLL_WAIT, remaining)
+        params = {'wait': wait}
+        if last_status is not None:
+            params['since'] = last_status
+        
+        requested_at = time.monotonic()
+        status_response = session.get(status_url, params=params, timeout=wait + 30)
+        held_for = time.monotonic() - requested_at
+        poll_count += 1
+        
+        if status_response.status_code != 200:
+            print(f"Error checking task status: {status_response.status_code}")
+            return False
+        
+        status_data = status_response.json()
+        status = status_data['status']
+        
+        if status == 'completed':
+            return True
+        elif status == 'failed':
+            print(f"Task failed: {status_data.get('task_id', status_url)}")
+            print(f"Error: {status_data.get('error', 'Unknown error')}")
+            return False
+        else:
+            print(f"Status: {status} (poll {poll_count})")
+        
+        changed = status != last_status
+        last_status = status
+        
+        # The server already waited for us, or the status just changed: ask again right away
+        if changed or held_for >= wait:
+            interval = MIN_POLL_INTERVAL
+            continue
+        
+        time.sleep(max(0.0, min(interval, deadline - time.monotonic())))
+        interval = min(interval * POLL_BACKOFF, MAX_POLL_INTERVAL)
+    
+    print(f"Task timed out: {status_url}")
+    return False
+
+def _wait_for_result(session: requests.Session, result_url: str, deadline: float) -> Optional[requests.Response]:
+    """
+    Long-poll a result URL until the task has finished, so no separate status requests are needed.
+    Returns the final response, or None on timeout. A server that answers 202 without holding
+    the request is polled with backoff instead.
+    """
+    interval = MIN_POLL_INTERVAL
+    poll_count = 0
+    
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        
+        wait = min(LONG_POLL_WAIT, remaining)
+        requested_at = time.monotonic()
+        result_response = session.get(result_url, params={'wait': wait}, timeout=wait + 30)
+        held_for = time.monotonic() - requested_at
+        poll_count += 1
+        
+        if result_response.status_code != 202:
+            return result_response
+        
+        print(f"Status: {result_response.json().get('detail', 'not ready')} (poll {poll_count})")
+        
+        if held_for < wait:
+            time.sleep(max(0.0, min(interval, deadline - time.monotonic())))
+            interval = min(interval * POLL_BACKOFF, MAX_POLL_INTERVAL)
+    
+    print(f"Task timed out: {result_url}")
+    return None
 
 def load_document(document_id: str, validation_dir: str) -> dict:
     validation_path = Path(validation_dir)
@@ -13,92 +153,131 @@ def load_document(document_id: str, validation_dir: str) -> dict:
     if not document_file.exists():
         raise FileNotFoundError(f"Document not found: {document_file}")
     
-    with open(document_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return orjson.loads(document_file.read_bytes())
+
+def normalize_pages(document: dict, entity_types=ANNOTATION_TYPES) -> list:
+    """
+    Return the pages -> paragraphs -> words tree of a document with every key filled in, so every
+    word has a text and every entity type flag and the later passes can index directly.
+    The containers are rebuilt and words missing a key are copied, the document itself is never
+    modified (it is also the payload sent to the server).
+    """
+    word_defaults = {'text': '', **dict.fromkeys(entity_types, False)}
+    required_keys = word_defaults.keys()
+    return [
+        {'paragraphs': [
+            {'words': [
+                word if required_keys <= word.keys() else {**word_defaults, **word}
+                for word in paragraph.get('words', [])
+            ]}
+            for paragraph in page.get('paragraphs', [])
+        ]}
+        for page in document.get('pages', [])
+    ]
+
+def flatten_document(document: dict, entity_types) -> dict:
+    """
+    Walk the pages -> paragraphs -> words tree once and return parallel flat arrays:
+    "text" holds every word text, stripped once here, "flags" is a numpy uint8 array with one bit per entity
+    type for every word ("bits" maps each entity type to its bit), and
+    "paragraph_ends"/"page_ends" hold the boundaries used to rebuild the text.
+    """
+    if len(entity_types) > 8:
+        raise ValueError(f"At most 8 entity types fit in the flag bitmask, got {len(entity_types)}")
+    
+    bits = {entity_type: 1 << index for index, entity_type in enumerate(entity_types)}
+    texts = []
+    flags = bytearray()
+    paragraph_ends = []
+    page_ends = []
+    
+    for page in normalize_pages(document, entity_types):
+        for paragraph in page['paragraphs']:
+            for word in paragraph['words']:
+                texts.append(word['text'].strip())
+                mask = 0
+                for entity_type, bit in bits.items():
+                    if word[entity_type]:
+                        mask |= bit
+                flags.append(mask)
+            paragraph_ends.append(len(texts))
+        page_ends.append(len(paragraph_ends))
+    
+    return {
+        'text': texts,
+        'flags': np.frombuffer(bytes(flags), dtype=np.uint8),
+        'bits': bits,
+        'paragraph_ends': paragraph_ends,
+        'page_ends': page_ends
+    }
 
-def extract_document_text(document: dict) -> str:
-    """Extract the full text content from a document."""
-    if 'pages' not in document:
-        return ""
+def extract_document_text(flat: dict) -> str:
+    """Extract the full text content from a flattened document."""
+    texts = flat['text']
+    paragraph_ends = flat['paragraph_ends']
     
     full_text = []
-    for page in document['pages']:
+    paragraph_index = 0
+    word_start = 0
+    for page_end in flat['page_ends']:
         page_text = []
-        for paragraph in page.get('paragraphs', []):
-            paragraph_text = []
-            for word in paragraph.get('words', []):
-                word_text = word.get('text', '')
-                if word_text:
-                    paragraph_text.append(word_text)
+        for word_end in paragraph_ends[paragraph_index:page_end]:
+            paragraph_text = [text for text in texts[word_start:word_end] if text]
             if paragraph_text:
                 page_text.append(' '.join(paragraph_text))
+            word_start = word_end
+        paragraph_index = page_end
         if page_text:
             full_text.append('\n'.join(page_text))
     
     return '\n\n'.join(full_text)
 
-def count_annotated_words(document: dict, entity_type) -> int:
+def count_annotated_words(flat: dict, entity_type) -> int:
     """Count words marked with a specific annotation."""
-    count = 0
-    if 'pages' not in document:
-        return count
-    
-    for page in document['pages']:
-        for paragraph in page.get('paragraphs', []):
-            for word in paragraph.get('words', []):
-                if word.get(entity_type, False):
-                    count += 1
-    
-    return count
+    return int(np.count_nonzero(flat['flags'] & flat['bits'][entity_type]))
 
-def extract_annotated_words(document: dict, entity_type) -> list:
+def extract_annotated_words(flat: dict, entity_type) -> list:
     """Extract the actual words that are annotated for a specific entity type."""
-    annotated_words = []
-    if 'pages' not in document:
-        return annotated_words
-    
-    for page in document['pages']:
-        for paragraph in page.get('paragraphs', []):
-            for word in paragraph.get('words', []):
-                word_text = word.get('text', '').strip()
-                if word_text and word.get(entity_type, False):
-                    annotated_words.append(word_text)
-    
-    return annotated_words
+    texts = flat['text']
+    marked_texts = (texts[index] for index in np.flatnonzero(flat['flags'] & flat['bits'][entity_type]))
+    return [text for text in marked_texts if text]
+
+def _reset_doc(document: dict) -> dict:
+    """
+    Rebuild the pages -> paragraphs -> words structure with every annotation flag set to False.
+    Only the containers on the path to the words are copied; the other values are shared.
+    """
+    cleared_flags = dict.fromkeys(ANNOTATION_TYPES, False)
+    return {
+        **document,
+        'pages': [
+            {**page, 'paragraphs': [
+                {**paragraph, 'words': [{**word, **cleared_flags} for word in paragraph.get('words', [])]}
+                for paragraph in page.get('paragraphs', [])
+            ]}
+            for page in document['pages']
+        ]
+    }
 
 def prepare_document_for_annotation(validation_doc: dict) -> dict:
     """Prepare document for annotation by setting all annotations to False."""
-    import copy
-    document = copy.deepcopy(validation_doc)
-    
-    if 'pages' in document:
-        for page in document['pages']:
-            for paragraph in page.get('paragraphs', []):
-                for word in paragraph.get('words', []):
-                    word['isTemei'] = False
-                    word['isProba'] = False
-                    word['isSelected'] = False
-                    word['isCerere'] = False
-                    word['isReclamant'] = False
-                    word['isParat'] = False
-    
-    return document
+    if 'pages' not in validation_doc:
+        return dict(validation_doc)
+    
+    return _reset_doc(validation_doc)
 
 def prepare_document_for_summary(validation_doc: dict) -> dict:
     """Prepare document for summarization by keeping existing annotations."""
-    import copy
-    document = copy.deepcopy(validation_doc)
-    
-    document['extraction_type'] = ['isTemei', 'isProba', 'isSelected', 'isCerere', 'isReclamant', 'isParat']#['isTemei', 'isProba', 'isSelected', 'isCerere']
-    
-    return document
+    # Only a top level key is added, so the reference document can be shared instead of copied
+    return {**validation_doc, 'extraction_type': list(ANNOTATION_TYPES)}
 
 def process_annotation_with_server(document: dict, server_url: str, timeout: int = 300) -> dict:
     """Process a document through the server annotation API and return the result."""
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{server_url}/annotate-document",
-            json=document,
+            data=_gzip_json_body(document),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
             timeout=timeout
         )
         
@@ -112,63 +291,82 @@ def process_annotation_with_server(document: dict, server_url: str, timeout: int
         print(f"Document submitted with task ID: {task_id}")
         print(task_response.get('status', ''))
         
-        max_polls = 60  # 5 minutes with 5-second intervals
-        poll_interval = 5
+        print("Waiting for processing to complete...")
+        result_response = _wait_for_result(get_session(), f"{server_url}/annotated-document/{task_id}", time.monotonic() + timeout)
+        if result_response is None:
+            return None
+        
+        if result_response.status_code != 200:
+            print(f"Error retrieving annotated document: {result_response.status_code}")
+            return None
+        
+        result = orjson.loads(result_response.content)
+        if result.get('error'):
+            print(f"Task failed: {task_id}")
+            print(f"Error: {result['error']}")
+            return None
+        print("Processing completed!")
+        
+        return result.get('document')
+        
+    except Exception as e:
+        print(f"Error processing document: {e}")
+        return None
+
+def process_annotation_batch(documents: list, server_url: str, timeout: int = 300) -> list:
+    """
+    Process several documents through the server batch annotation API in a single submission.
+    Returns the annotated documents in input order (None for documents that failed), or None on error.
+    """
+    try:
+        response = get_session().post(
+            f"{server_url}/annotate-documents",
+            data=_gzip_json_body({"documents": documents}),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            timeout=timeout
+        )
+        
+        if response.status_code != 200:
+            print(f"Error submitting documents: {response.status_code}")
+            print(f"Response: {response.text}")
+            return None
+        
+        task_response = response.json()
+        task_id = task_response['task_id']
+        print(f"{len(documents)} documents submitted with batch task ID: {task_id}")
         
         print("Waiting for processing to complete...")
-        for poll_count in range(max_polls):
-            status_response = requests.get(
-                f"{server_url}/task-status/{task_id}",
-                timeout=30
-            )
-            
-            if status_response.status_code != 200:
-                print(f"Error checking task status: {status_response.status_code}")
-                return None
-            
-            status_data = status_response.json()
-            status = status_data['status']
-            print(status)
-            
-            if status == 'completed':
-                print("Processing completed!")
-                break
-            elif status == 'failed':
-                print(f"Task failed: {task_id}")
-                print(f"Error: {status_data.get('error', 'Unknown error')}")
-                return None
-            else:
-                print(f"Status: {status} (poll {poll_count + 1}/{max_polls})")
-            
-            import time
-            time.sleep(poll_interval)
-        else:
-            print(f"Task timed out: {task_id}")
+        if not _poll_until_done(get_session(), f"{server_url}/task-status/{task_id}", time.monotonic() + timeout):
             return None
+        print("Processing completed!")
         
-        result_response = requests.get(
-            f"{server_url}/annotated-document/{task_id}",
+        result_response = get_session().get(
+            f"{server_url}/annotated-documents/{task_id}",
             timeout=30
         )
         
         if result_response.status_code != 200:
-            print(f"Error retrieving annotated document: {result_response.status_code}")
+            print(f"Error retrieving annotated documents: {result_response.status_code}")
             return None
         
-        result = result_response.json()
-        return result.get('document')
+        results = orjson.loads(result_response.content)['results']
+        for result in results:
+            if result.get('error'):
+                print(f"Task {result['task_id']} failed: {result['error']}")
+        return [result.get('document') for result in results]
         
     except Exception as e:
-        print(f"Error processing document: {e}")
+        print(f"Error processing documents: {e}")
         return None
 
 def process_summary_with_server(document: dict, server_url: str, timeout: int = 300) -> dict:
     """Process a document through the server summarization API and return the result."""
     try:
         # Submit document for summarization
-        response = requests.post(
+        response = get_session().post(
             f"{server_url}/summarize-document",
-            json=document,
+            data=_gzip_json_body(document),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
             timeout=timeout
         )
         
@@ -181,208 +379,212 @@ def process_summary_with_server(document: dict, server_url: str, timeout: int =
         task_id = task_response['task_id']
         print(f"Document submitted for summarization with task ID: {task_id}")
         
-        # Poll for completion
-        max_polls = 60  # 5 minutes with 5-second intervals
-        poll_interval = 5
-        
+        # Long-poll the result until the summary is ready
         print("Waiting for summarization to complete...")
-        for poll_count in range(max_polls):
-            status_response = requests.get(
-                f"{server_url}/task-status/{task_id}",
-                timeout=30
-            )
-            
-            if status_response.status_code != 200:
-                print(f"Error checking task status: {status_response.status_code}")
-                return None
-            
-            status_data = status_response.json()
-            status = status_data['status']
-            
-            if status == 'completed':
-                print("Summarization completed!")
-                break
-            elif status == 'failed':
-                print(f"Task failed: {task_id}")
-                print(f"Error: {status_data.get('error', 'Unknown error')}")
-                return None
-            else:
-                print(f"Status: {status} (poll {poll_count + 1}/{max_polls})")
-            
-            import time
-            time.sleep(poll_interval)
-        else:
-            print(f"Task timed out: {task_id}")
+        result_response = _wait_for_result(get_session(), f"{server_url}/summarized-document/{task_id}", time.monotonic() + timeout)
+        if result_response is None:
             return None
         
-        result_response = requests.get(
-            f"{server_url}/summarized-document/{task_id}",
-            timeout=30
-        )
-        
         if result_response.status_code != 200:
             print(f"Error retrieving summarized document: {result_response.status_code}")
             return None
         
         result = result_response.json()
+        if result.get('error'):
+            print(f"Task failed: {task_id}")
+            print(f"Error: {result['error']}")
+            return None
+        print("Summarization completed!")
+        
         return result.get('summary')
         
     except Exception as e:
         print(f"Error processing document: {e}")
         return None
 
-def run_annotation_task(args, reference_doc, full_text):
-    """Run annotation task and display results."""
-    ref_count = count_annotated_words(reference_doc, args.entity_type)
-    ref_words = extract_annotated_words(reference_doc, args.entity_type)
-    
+def _write_report(report: list):
+    """Write the report lines to stdout in a single call, as print would have written them one by one."""
+    text = '\n'.join(report)
+    stdout_buffer = getattr(sys.stdout, 'buffer', None)
+    if stdout_buffer is None:
+        # stdout was replaced by a text-only stream (e.g. StringIO or a test capture)
+        print(text)
+        return
+    
+    sys.stdout.flush()
+    stdout_buffer.write((text + '\n').encode(sys.stdout.encoding or 'utf-8', errors='replace'))
+    stdout_buffer.flush()
+
+def run_annotation_task(args, references):
+    """Run annotation task for (document_id, reference_doc, reference_flat) entries and display results."""
     print("Preparing document for server processing...")
-    processed_input = prepare_document_for_annotation(reference_doc)
+    processed_inputs = [prepare_document_for_annotation(reference_doc) for _, reference_doc, _ in references]
     
     print("Sending document to server for annotation...")
-    processed_doc = process_annotation_with_server(processed_input, args.server_url, args.timeout)
+    if len(processed_inputs) == 1:
+        processed_docs = [process_annotation_with_server(processed_inputs[0], args.server_url, args.timeout)]
+    else:
+        processed_docs = process_annotation_batch(processed_inputs, args.server_url, args.timeout) or [None] * len(processed_inputs)
     
-    if processed_doc is None:
+    if all(processed_doc is None for processed_doc in processed_docs):
         print("Failed to process document through server")
         sys.exit(1)
     
-    pred_count = count_annotated_words(processed_doc, args.entity_type)
-    pred_words = extract_annotated_words(processed_doc, args.entity_type)
-    
-    print("\n" + "="*80)
-    print(f"ANNOTATION ANALYSIS RESULTS FOR: {args.document_id}")
+    for (document_id, _, reference_flat), processed_doc in zip(references, processed_docs):
+        if processed_doc is None:
+            print(f"Failed to process document {document_id} through server")
+            continue
+        report_annotation_results(args, document_id, reference_flat, processed_doc)
+
+def report_annotation_results(args, document_id, reference_flat, processed_doc):
+    """Compare the server annotations of a document with its reference and display the results."""
+    ref_count = count_annotated_words(reference_flat, args.entity_type)
+    ref_words = extract_annotated_words(reference_flat, args.entity_type)
+    
+    processed_flat = flatten_document(processed_doc, (args.entity_type,))
+    pred_count = count_annotated_words(processed_flat, args.entity_type)
+    pred_words = extract_annotated_words(processed_flat, args.entity_type)
+    
+    report = []
+    report.append("\n" + "="*80)
+    report.append(f"ANNOTATION ANALYSIS RESULTS FOR: {document_id}")
     if hasattr(args, 'document_type'):
-        print(f"Document type: {args.document_type}")
-    print("="*80)
-    
-    print(f"\nENTIRE TEXT:")
-    print("-" * 40)
-    print(full_text)
-    
-    print(f"\nSTATISTICS FOR {args.entity_type.upper()}:")
-    print("-" * 40)
-    print(f"Number of words marked in reference: {ref_count}")
-    print(f"Number of words marked by server: {pred_count}")
-    
-    print(f"\nREFERENCE ANNOTATED TEXT ({args.entity_type}):")
-    print("-" * 40)
-    if ref_words:
-        print(' '.join(ref_words))
-    else:
-        print("(No words annotated in reference)")
-    
-    print(f"\nSERVER ANNOTATED TEXT ({args.entity_type}):")
-    print("-" * 40)
-    if pred_words:
-        print(' '.join(pred_words))
-    else:
-        print("(No words annotated by server)")
+        report.append(f"Document type: {args.document_type}")
+    report.append("="*80)
+    
+    # The full text and annotated word dumps can be huge, only build them when asked to
+    if args.verbose:
+        report.append(f"\nENTIRE TEXT:")
+        report.append("-" * 40)
+        report.append(extract_document_text(reference_flat))
+    
+    report.append(f"\nSTATISTICS FOR {args.entity_type.upper()}:")
+    report.append("-" * 40)
+    report.append(f"Number of words marked in reference: {ref_count}")
+    report.append(f"Number of words marked by server: {pred_count}")
+    
+    if args.verbose:
+        report.append(f"\nREFERENCE ANNOTATED TEXT ({args.entity_type}):")
+        report.append("-" * 40)
+        if ref_words:
+            report.append(' '.join(ref_words))
+        else:
+            report.append("(No words annotated in reference)")
+        
+        report.append(f"\nSERVER ANNOTATED TEXT ({args.entity_type}):")
+        report.append("-" * 40)
+        if pred_words:
+            report.append(' '.join(pred_words))
+        else:
+            report.append("(No words annotated by server)")
     
-    print(f"\nCOMPARISON:")
-    print("-" * 40)
-    ref_set = set(ref_words)
-    pred_set = set(pred_words)
+    report.append(f"\nCOMPARISON:")
+    report.append("-" * 40)
+    # Compare as multisets, so a word annotated several times has to be found as many times
+    ref_counts = Counter(ref_words)
+    pred_counts = Counter(pred_words)
     
-    correctly_identified = ref_set & pred_set
-    missed = ref_set - pred_set
-    extra = pred_set - ref_set
+    correctly_identified = ref_counts & pred_counts
+    missed = ref_counts - pred_counts
+    extra = pred_counts - ref_counts
     
     if correctly_identified:
-        print(f"Correctly identified: {' '.join(sorted(correctly_identified))}")
+        report.append(f"Correctly identified: {' '.join(sorted(correctly_identified.elements()))}")
     if missed:
-        print(f"Missed by server: {' '.join(sorted(missed))}")
+        report.append(f"Missed by server: {' '.join(sorted(missed.elements()))}")
     if extra:
-        print(f"Extra annotations by server: {' '.join(sorted(extra))}")
+        report.append(f"Extra annotations by server: {' '.join(sorted(extra.elements()))}")
     
     accuracy_stats = {
-        'total_reference': len(ref_set),
-        'total_predicted': len(pred_set),
-        'correctly_identified': len(correctly_identified),
-        'missed': len(missed),
-        'extra': len(extra)
+        'total_reference': len(ref_words),
+        'total_predicted': len(pred_words),
+        'correctly_identified': sum(correctly_identified.values()),
+        'missed': sum(missed.values()),
+        'extra': sum(extra.values())
     }
     
     if accuracy_stats['total_reference'] > 0:
         recall = accuracy_stats['correctly_identified'] / accuracy_stats['total_reference']
-        print(f"\nRecall: {recall:.2%} ({accuracy_stats['correctly_identified']}/{accuracy_stats['total_reference']})")
+        report.append(f"\nRecall: {recall:.2%} ({accuracy_stats['correctly_identified']}/{accuracy_stats['total_reference']})")
     
     if accuracy_stats['total_predicted'] > 0:
         precision = accuracy_stats['correctly_identified'] / accuracy_stats['total_predicted']
-        print(f"Precision: {precision:.2%} ({accuracy_stats['correctly_identified']}/{accuracy_stats['total_predicted']})")
-
-def run_summary_task(args, reference_doc, full_text):
-    """Run summary task and display results."""
-    all_annotation_types = ['isTemei', 'isProba', 'isSelected', 'isCerere', 'isReclamant', 'isParat']
-    
-    annotation_to_summary_field = {
-        'isTemei': 'Temei',
-        'isProba': 'Proba', 
-        'isSelected': 'Selected',
-        'isCerere': 'Cerere',
-        'isReclamant': 'Reclamant',
-        'isParat': 'Parat'
-    }
-    
-    category_names = {
-        'isTemei': 'Temeiul Legal',
-        'isProba': 'Probele și Dovezile',
-        'isSelected': 'Descrierea Faptelor',
-        'isCerere': 'Cererea',
-        'isReclamant': 'Reclamantul',
-        'isParat': 'Pârâtul'
-    }
+        report.append(f"Precision: {precision:.2%} ({accuracy_stats['correctly_identified']}/{accuracy_stats['total_predicted']})")
     
+    _write_report(report)
+
+def run_summary_task(args, references):
+    """Run summary task for (document_id, reference_doc, reference_flat) entries and display results."""
     print("Preparing document for server processing...")
-    processed_input = prepare_document_for_summary(reference_doc)
+    processed_inputs = [prepare_document_for_summary(reference_doc) for _, reference_doc, _ in references]
     
     print("Sending document to server for summarization...")
-    summary_result = process_summary_with_server(processed_input, args.server_url, args.timeout)
-    
-    if summary_result is None:
+    # There is no batch summarization endpoint, so overlap the per-document submit and poll
+    # round trips instead; the reports are still printed in input order
+    with ThreadPoolExecutor(max_workers=min(len(processed_inputs), MAX_CONCURRENT_DOCUMENTS)) as executor:
+        summary_results = list(executor.map(
+            lambda processed_input: process_summary_with_server(processed_input, args.server_url, args.timeout),
+            processed_inputs
+        ))
+    
+    if all(summary_result is None for summary_result in summary_results):
         print("Failed to process document through server")
         sys.exit(1)
     
-    print("\n" + "="*80)
-    print(f"SUMMARY ANALYSIS RESULTS FOR: {args.document_id}")
+    for (document_id, _, reference_flat), summary_result in zip(references, summary_results):
+        if summary_result is None:
+            print(f"Failed to process document {document_id} through server")
+            continue
+        report_summary_results(args, document_id, reference_flat, summary_result)
+
+def report_summary_results(args, document_id, reference_flat, summary_result):
+    """Display the generated summary of a document next to its reference annotations."""
+    report = []
+    report.append("\n" + "="*80)
+    report.append(f"SUMMARY ANALYSIS RESULTS FOR: {document_id}")
     if hasattr(args, 'document_type'):
-        print(f"Document type: {args.document_type.upper()}")
-    print("="*80)
-    
-    print(f"\nFULL DOCUMENT TEXT:")
-    print("-" * 60)
-    print(full_text)
-    print("\n")
-    
-    for annotation_type in all_annotation_types:
-        category_name = category_names.get(annotation_type, annotation_type)
-        summary_field = annotation_to_summary_field.get(annotation_type)
+        report.append(f"Document type: {args.document_type.upper()}")
+    report.append("="*80)
+    
+    # The full text and annotated word dumps can be huge, only build them when asked to
+    if args.verbose:
+        report.append(f"\nFULL DOCUMENT TEXT:")
+        report.append("-" * 60)
+        report.append(extract_document_text(reference_flat))
+        report.append("\n")
+    
+    for annotation_type in ANNOTATION_TYPES:
+        category_name = CATEGORY_NAMES.get(annotation_type, annotation_type)
+        summary_field = ANNOTATION_TO_SUMMARY_FIELD.get(annotation_type)
         
-        print("="*80)
-        print(f"CATEGORY: {category_name} ({annotation_type})")
-        print("="*80)
+        report.append("="*80)
+        report.append(f"CATEGORY: {category_name} ({annotation_type})")
+        report.append("="*80)
         
-        annotated_words = extract_annotated_words(reference_doc, annotation_type)
-        
-        print(f"\nANNOTATED TEXT IN REFERENCE ({annotation_type}):")
-        print("-" * 60)
-        if annotated_words:
-            annotated_text = ' '.join(annotated_words)
-            print(annotated_text)
-        else:
-            print("(No words annotated in reference for this category)")
+        if args.verbose:
+            annotated_words = extract_annotated_words(reference_flat, annotation_type)
+            
+            report.append(f"\nANNOTATED TEXT IN REFERENCE ({annotation_type}):")
+            report.append("-" * 60)
+            if annotated_words:
+                report.append(' '.join(annotated_words))
+            else:
+                report.append("(No words annotated in reference for this category)")
         
-        print(f"\nGENERATED SUMMARY ({summary_field}):")
-        print("-" * 60)
+        report.append(f"\nGENERATED SUMMARY ({summary_field}):")
+        report.append("-" * 60)
         if summary_result and isinstance(summary_result, dict) and summary_field in summary_result:
             summary_content = summary_result.get(summary_field, '')
             if summary_content:
-                print(summary_content)
+                report.append(summary_content)
             else:
-                print("(No summary generated for this category)")
+                report.append("(No summary generated for this category)")
         else:
-            print("(Summary not available)")
+            report.append("(Summary not available)")
         
-        print("\n")
+        report.append("\n")
+    
+    _write_report(report)
 
 def main():
     """Main function to test a single document."""
@@ -391,7 +593,8 @@ def main():
                        choices=["annotation", "summary"],
                        help="Type of task: annotation or summary")
     parser.add_argument("document_id", 
-                       help="Document ID (e.g., 3196_306_2024.json)")
+                       nargs="+",
+                       help="Document ID (e.g., 3196_306_2024.json). Several IDs are annotated in a single batch")
     parser.add_argument("--document-type", "-d",
                        choices=["subpoena", "counterclaim"],
                        help="Type of document: subpoena or counterclaim (used for default validation dir)")
@@ -406,6 +609,9 @@ def main():
     parser.add_argument("--entity-type", "-e", 
                        default="isProba",
                        help="Entity type to analyze for annotation task (default: isProba)")
+    parser.add_argument("--verbose", 
+                       action="store_true",
+                       help="Also print the full document text and the annotated words")
 
     args = parser.parse_args()
     
@@ -419,7 +625,7 @@ def main():
             sys.exit(1)
     
     try:
-        response = requests.get(f"{args.server_url}/health", timeout=30)
+        response = get_session().get(f"{args.server_url}/health", timeout=30)
         if response.status_code != 200:
             print(f"Warning: Server health check failed with status {response.status_code}")
         else:
@@ -430,17 +636,19 @@ def main():
         sys.exit(1)
     
     try:
-        print(f"Loading document: {args.document_id}")
-        if hasattr(args, 'document_type') and args.document_type:
-            print(f"Document type: {args.document_type}")
-        reference_doc = load_document(args.document_id, args.validation_dir)
-        
-        full_text = extract_document_text(reference_doc)
+        entity_types = ANNOTATION_TYPES if args.entity_type in ANNOTATION_TYPES else ANNOTATION_TYPES + (args.entity_type,)
+        references = []
+        for document_id in args.document_id:
+            print(f"Loading document: {document_id}")
+            if hasattr(args, 'document_type') and args.document_type:
+                print(f"Document type: {args.document_type}")
+            reference_doc = load_document(document_id, args.validation_dir)
+            references.append((document_id, reference_doc, flatten_document(reference_doc, entity_types)))
         
         if args.task_type == "annotation":
-            run_annotation_task(args, reference_doc, full_text)
+            run_annotation_task(args, references)
         elif args.task_type == "summary":
-            run_summary_task(args, reference_doc, full_text)
+            run_summary_task(args, references)
         
     except Exception as e:
         print(f"Error during processing: {e}")
@@ -11,31 +11,48 @@ Usage:
     python create_subpoena_sharegpt.py --doc_type counterclaim
 """
 
-import json
 import os
+import re
+import orjson
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Iterator
 import logging
 import sys
 import argparse
+from functools import partial, lru_cache
+from itertools import chain, islice
+from multiprocessing import Pool
+from types import MappingProxyType
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils import get_system_prompt_for_task_type, build_user_prompt_for_task_type
+from utils import get_system_prompt_for_task_type, build_user_prompts_for_categories, ANNOTATION_CATEGORIES
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Map document types to directory names
+DIR_MAPPING = MappingProxyType({
+    'subpoena': 'subpoenas',
+    'counterclaim': 'counterclaims'
+})
+
+# A word is a run of non-whitespace characters, as for str.split()
+WORD_PATTERN = re.compile(r"\S+")
+
 def load_document_data(file_path: Path) -> Dict[str, Any]:
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return orjson.loads(file_path.read_bytes())
     except Exception as e:
         logger.error(f"Error loading file {file_path}: {str(e)}")
         return None
 
-def create_sharegpt_entry(content: str, extracted_text: str, category: str, document_type: str) -> Dict[str, Any]:
-    user_content = build_user_prompt_for_task_type(content, category, "annotation", document_type)
-    system_prompt = get_system_prompt_for_task_type(document_type, "annotation")
+@lru_cache(maxsize=None)
+def _cached_system_prompt(document_type: str) -> str:
+    """The annotation system prompt only depends on the document type, so look it up once per type."""
+    return sys.intern(get_system_prompt_for_task_type(document_type, "annotation"))
+
+def create_sharegpt_entry(user_content: str, extracted_text: str, document_type: str) -> Dict[str, Any]:
+    system_prompt = _cached_system_prompt(document_type)
     
     return {
         "messages": [
@@ -65,74 +82,79 @@ def should_include_entry(extracted_text: str, min_words: int = 5) -> bool:
     Returns:
         True if entry should be included, False otherwise
     """
-    # Skip if empty or too short
-    if not extracted_text or not extracted_text.strip():
+    # Skip if empty
+    if not extracted_text:
         return False
     
-    # Count words
-    word_count = len(extracted_text.split())
-    if word_count < min_words:
+    # Count words, but stop as soon as there are enough of them; whitespace-only text has none
+    word_count = sum(1 for _ in islice(WORD_PATTERN.finditer(extracted_text), max(min_words, 1)))
+    if word_count == 0 or word_count < min_words:
         return False
     
     return True
 
-def process_document_file(file_path: Path, document_type: str) -> Dict[str, List[Dict[str, Any]]]:
+def process_document_file(file_path: Path, document_type: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
     """
     Process a single document file and create ShareGPT entries organized by category.
+    Errors are logged here rather than raised, so one bad file does not stop the pool.
     
     Args:
         file_path: Path to the document JSON file
         document_type: Type of document (subpoena, counterclaim, etc.)
         
     Returns:
-        Dictionary with category names as keys and lists of ShareGPT entries as values
+        Dictionary with category names as keys and lists of ShareGPT entries as values,
+        or None if processing the file failed
     """
-    data = load_document_data(file_path)
-    if not data:
-        return {}
-    
-    content = data.get('content', '')
-    if not content or not content.strip():
-        logger.warning(f"No content found in {file_path}")
-        return {}
-    
-    category_entries = {}
-    
-    # Categories to process (excluding content which is the full text)
-    categories = ['isTemei', 'isProba', 'isSelected', 'isCerere', 'isReclamant', 'isParat']
-    
-    for category in categories:
-        extracted_text = data.get(category, '')
+    try:
+        data = load_document_data(file_path)
+        if not data:
+            return {}
         
-        if should_include_entry(extracted_text):
-            try:
-                entry = create_sharegpt_entry(content, extracted_text, category, document_type)
-                if category not in category_entries:
-                    category_entries[category] = []
-                category_entries[category].append(entry)
-                
-            except Exception as e:
-                logger.error(f"Error creating entry for {category} in {file_path}: {str(e)}")
+        content = data.get('content', '')
+        if not content or not content.strip():
+            logger.warning(f"No content found in {file_path}")
+            return {}
+        
+        category_entries = {}
+        
+        # Categories to process (excluding content which is the full text)
+        included_categories = [category for category in ANNOTATION_CATEGORIES if should_include_entry(data.get(category, ''))]
+        if not included_categories:
+            return category_entries
+        
+        # The document text is the same for every category, so build all the user prompts at once
+        user_prompts = build_user_prompts_for_categories(content, included_categories, "annotation", document_type)
+        
+        for category in included_categories:
+            entry = create_sharegpt_entry(user_prompts[category], data[category], document_type)
+            if category not in category_entries:
+                category_entries[category] = []
+            category_entries[category].append(entry)
+        
+        return category_entries
     
-    return category_entries
+    except Exception as e:
+        logger.error(f"Error processing {file_path}: {str(e)}")
+        return None
 
-def find_document_files(documents_dir: Path) -> List[Path]:
-    return list(documents_dir.glob('*.json'))
+def iter_document_files(documents_dir: Path) -> Iterator[Path]:
+    """Lazily yield the JSON files of a directory, without listing it up front."""
+    with os.scandir(documents_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                yield Path(entry.path)
 
 def main():
     parser = argparse.ArgumentParser(description='Convert documents dataset to ShareGPT format')
     parser.add_argument('--type', default='subpoena', 
                        help='Document type to process (default: subpoena). Determines the source directory.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                       help='Number of worker processes (default: number of CPUs)')
     args = parser.parse_args()
     
     document_type = args.type
-    # Map document types to directory names
-    dir_mapping = {
-        'subpoena': 'subpoenas',
-        'counterclaim': 'counterclaims'
-    }
-    
-    documents_dir = Path(dir_mapping.get(document_type, f"{document_type}s"))
+    documents_dir = Path(DIR_MAPPING.get(document_type, f"{document_type}s"))
     output_dir = Path('.')
     
     logger.info("Starting ShareGPT dataset creation...")
@@ -140,59 +162,58 @@ def main():
     logger.info(f"Documents directory: {documents_dir}")
     logger.info(f"Output directory: {output_dir}")
     
-    # Find all document files
-    document_files = find_document_files(documents_dir)
+    # Stream the document files; only peek at the first one to detect an empty directory
+    document_files = iter_document_files(documents_dir) if documents_dir.is_dir() else iter(())
+    first_file = next(document_files, None)
     
-    if not document_files:
+    if first_file is None:
         logger.error(f"No {document_type} files found in {documents_dir}!")
         return
     
-    logger.info(f"Found {len(document_files)} {document_type} files")
+    document_files = chain((first_file,), document_files)
     
-    # Initialize entries dictionary for each category
-    categories = ['isTemei', 'isProba', 'isSelected', 'isCerere', 'isReclamant', 'isParat']
-    category_entries = {category: [] for category in categories}
+    output_files = {category: output_dir / f"{document_type}s_sharegpt_{category}.jsonl" for category in ANNOTATION_CATEGORIES}
+    
+    # Entries are streamed to one JSONL file per category as the files are processed;
+    # a file is only created once its category gets its first entry
+    output_handles = {}
+    category_counts = {category: 0 for category in ANNOTATION_CATEGORIES}
     
     processed_count = 0
     error_count = 0
     
-    # Process each file
-    for file_path in document_files:
-        try:
-            entries_by_category = process_document_file(file_path, document_type)
-            
-            # Add entries to their respective category lists
-            for category, entries in entries_by_category.items():
-                category_entries[category].extend(entries)
-            
-            processed_count += 1
-            
-            if processed_count % 100 == 0:
-                total_entries = sum(len(entries) for entries in category_entries.values())
-                logger.info(f"Processed {processed_count} files, generated {total_entries} entries so far...")
+    try:
+        # Process the files in parallel; imap keeps the input order so the output is deterministic
+        worker = partial(process_document_file, document_type=document_type)
+        with Pool(max(1, args.workers)) as pool:
+            for entries_by_category in pool.imap(worker, document_files, chunksize=32):
+                if entries_by_category is None:
+                    error_count += 1
+                    continue
                 
-        except Exception as e:
-            logger.error(f"Error processing {file_path}: {str(e)}")
-            error_count += 1
-    
-    # Save separate ShareGPT datasets for each category
-    total_entries = 0
-    saved_files = []
-    
-    for category in categories:
-        entries = category_entries[category]
-        if entries:
-            output_file = output_dir / f"{document_type}s_sharegpt_{category}.json"
-            try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(entries, f, indent=2, ensure_ascii=False)
+                # Append the entries to their respective category files
+                for category, entries in entries_by_category.items():
+                    handle = output_handles.get(category)
+                    if handle is None:
+                        handle = output_handles[category] = open(output_files[category], 'wb')
+                    handle.writelines(orjson.dumps(entry) + b"\n" for entry in entries)
+                    category_counts[category] += len(entries)
                 
-                total_entries += len(entries)
-                saved_files.append((category, len(entries), output_file))
-                logger.info(f"Saved {len(entries)} entries for {category} to {output_file}")
+                processed_count += 1
                 
-            except Exception as e:
-                logger.error(f"Error saving {category} dataset: {str(e)}")
+                if processed_count % 100 == 0:
+                    total_entries = sum(category_counts.values())
+                    logger.info(f"Processed {processed_count} files, generated {total_entries} entries so far...")
+    finally:
+        for handle in output_handles.values():
+            handle.close()
+    
+    total_entries = sum(category_counts.values())
+    saved_files = [(category, category_counts[category], output_files[category])
+                   for category in ANNOTATION_CATEGORIES if category in output_handles]
+    
+    for category, count, output_file in saved_files:
+        logger.info(f"Saved {count} entries for {category} to {output_file}")
     
     logger.info("="*50)
     logger.info("ShareGPT dataset creation completed!")
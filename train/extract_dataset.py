@@ -30,125 +30,112 @@ The script extracts:
 - Words marked as isSelected
 """
 
-import json
 import os
+import orjson
 import argparse
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import logging
-import re
 import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Tags delimiting the paragraphs in the category texts
+PARAGRAPH_OPEN = '<p>'
+PARAGRAPH_CLOSE = '</p>'
+
+# Word level annotation flags, each extracted into its own category
+FLAG_KEYS = ('isProba', 'isTemei', 'isCerere', 'isReclamant', 'isParat', 'isSelected')
+
+# Includes the cedilla variants of ș and ț, which older OCR output still uses
+_DIACRITICS = frozenset('ăâîșțĂÂÎȘȚşţŞŢ')
+
 def has_romanian_diacritics(text: str) -> bool:
-    romanian_diacritics = r'[ăâîșțĂÂÎȘȚşţŞŢ]'
-    return bool(re.search(romanian_diacritics, text))
+    return not _DIACRITICS.isdisjoint(text)
 
-def is_valid_content(content: str, word_count: int) -> bool:
+def is_valid_content(tokens: List[str], word_count: int) -> bool:
     # Documents with less than 100 words are likely incomplete or invalid
     if word_count < 100:
         return False
     
-    # We skip badly OCRed documents, which usually have no diacritics
-    if not has_romanian_diacritics(content):
+    # We skip badly OCRed documents, which usually have no diacritics. The tokens are
+    # scanned one by one so we can stop at the first diacritic without joining them
+    if not any(has_romanian_diacritics(token) for token in tokens):
         return False
     
     return True
 
-def extract_words_by_category(pages: List[Dict]) -> Dict[str, List[str]]:
-    """Extract words from pages categorized by their annotation flags, preserving paragraph structure."""
-    categories = {
-        'content': [],
-        'isProba': [],
-        'isTemei': [],
-        'isCerere': [],
-        'isReclamant': [],
-        'isParat': [],
-        'isSelected': []
-    }
+def extract_words_by_category(pages: List[Dict]) -> Tuple[Dict[str, List[str]], Dict[str, int], int]:
+    """
+    Extract words from pages categorized by their annotation flags, preserving paragraph structure.
+    
+    Every category is a flat list of tokens where each paragraph is delimited by '<p>' and '</p>'
+    tokens, so the category text is a single ' '.join of its list. Paragraphs without words
+    for a category are left out of it. Also returns the number of paragraphs per category
+    and the number of words that are not blank.
+    """
+    categories = {'content': [], **{flag: [] for flag in FLAG_KEYS}}
+    paragraph_counts = dict.fromkeys(categories, 0)
+    
+    # Bound once here, it runs for every word
+    append_content = categories['content'].append
+    flag_tokens = tuple((flag, categories[flag]) for flag in FLAG_KEYS)
+    word_count = 0
     
     for page in pages:
-        for paragraph in page.get('paragraphs', []):
-            paragraph_content = []
-            paragraph_proba = []
-            paragraph_temei = []
-            paragraph_cerere = []
-            paragraph_reclamant = []
-            paragraph_parat = []
-            paragraph_selected = []
+        for paragraph in page.get('paragraphs', ()):
+            # Open the paragraph in every category and drop it again below if it stayed empty
+            starts = []
+            for tokens in categories.values():
+                tokens.append(PARAGRAPH_OPEN)
+                starts.append(len(tokens))
             
-            for word in paragraph.get('words', []):
+            for word in paragraph.get('words', ()):
                 word_text = word.get('text', '')
                 if not word_text:
                     continue
                     
-                paragraph_content.append(word_text)
+                append_content(word_text)
+                # Whitespace-only words vanish once the content is split, so they are not counted
+                if not word_text.isspace():
+                    word_count += 1
                 
-                if word.get('isProba', False):
-                    paragraph_proba.append(word_text)
-                if word.get('isTemei', False):
-                    paragraph_temei.append(word_text)
-                if word.get('isCerere', False):
-                    paragraph_cerere.append(word_text)
-                if word.get('isReclamant', False):
-                    paragraph_reclamant.append(word_text)
-                if word.get('isParat', False):
-                    paragraph_parat.append(word_text)
-                if word.get('isSelected', False):
-                    paragraph_selected.append(word_text)
+                for flag, tokens in flag_tokens:
+                    if word.get(flag):
+                        tokens.append(word_text)
             
-            if paragraph_content:
-                content_text = ' '.join(paragraph_content)
-                categories['content'].append(f"<p> {content_text} </p>")
-                
-                if paragraph_proba:
-                    proba_text = ' '.join(paragraph_proba)
-                    categories['isProba'].append(f"<p> {proba_text} </p>")
-                
-                if paragraph_temei:
-                    temei_text = ' '.join(paragraph_temei)
-                    categories['isTemei'].append(f"<p> {temei_text} </p>")
-                
-                if paragraph_cerere:
-                    cerere_text = ' '.join(paragraph_cerere)
-                    categories['isCerere'].append(f"<p> {cerere_text} </p>")
-                
-                if paragraph_reclamant:
-                    reclamant_text = ' '.join(paragraph_reclamant)
-                    categories['isReclamant'].append(f"<p> {reclamant_text} </p>")
-                
-                if paragraph_parat:
-                    parat_text = ' '.join(paragraph_parat)
-                    categories['isParat'].append(f"<p> {parat_text} </p>")
+            for (category, tokens), start in zip(categories.items(), starts):
+                if len(tokens) == start:
+                    tokens.pop()
+                else:
+                    tokens.append(PARAGRAPH_CLOSE)
+                    paragraph_counts[category] += 1
                 
-                if paragraph_selected:
-                    selected_text = ' '.join(paragraph_selected)
-                    categories['isSelected'].append(f"<p> {selected_text} </p>")
-                
-    return categories
+    return categories, paragraph_counts, word_count
 
 def process_document_file(file_path: Path) -> Dict[str, Any]:
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = orjson.loads(file_path.read_bytes())
         
         case_number = data.get('caseNumber', '')
         document_type = data.get('documentTypeName', '')
         
         pages = data.get('pages', [])
         
-        word_categories = extract_words_by_category(pages)
+        word_categories, paragraph_counts, total_word_count = extract_words_by_category(pages)
         
-        full_content = ' '.join(word_categories['content'])
-        total_word_count = sum(len(p.split()) - 2 for p in word_categories['content'])  # -2 to exclude <p> and </p> tags
+        # Validate on the token list first, rejected documents never get joined into full_content
+        content_tokens = word_categories['content']
         
-        if not is_valid_content(full_content, total_word_count):
-            logger.debug(f"Skipping file - validation failed: words={total_word_count}, has_diacritics={has_romanian_diacritics(full_content)}")
+        if not is_valid_content(content_tokens, total_word_count):
+            logger.debug(f"Skipping file - validation failed: words={total_word_count}")
             return None
         
+        full_content = ' '.join(content_tokens)
+        
         result = {
             'case_number': case_number,
             'document_type': document_type,
@@ -161,12 +148,12 @@ def process_document_file(file_path: Path) -> Dict[str, Any]:
             'isSelected': ' '.join(word_categories['isSelected']),
             'word_counts': {
                 'total_words': total_word_count,
-                'proba_paragraphs': len(word_categories['isProba']),
-                'temei_paragraphs': len(word_categories['isTemei']),
-                'cerere_paragraphs': len(word_categories['isCerere']),
-                'reclamant_paragraphs': len(word_categories['isReclamant']),
-                'parat_paragraphs': len(word_categories['isParat']),
-                'selected_paragraphs': len(word_categories['isSelected'])
+                'proba_paragraphs': paragraph_counts['isProba'],
+                'temei_paragraphs': paragraph_counts['isTemei'],
+                'cerere_paragraphs': paragraph_counts['isCerere'],
+                'reclamant_paragraphs': paragraph_counts['isReclamant'],
+                'parat_paragraphs': paragraph_counts['isParat'],
+                'selected_paragraphs': paragraph_counts['isSelected']
             }
         }
         
@@ -180,29 +167,75 @@ def find_document_files(base_dir: Path, filename: str) -> List[Path]:
     """Find all files with the specified filename in the dataset directories."""
     document_files = []
     
-    # Look in all data directories
-    for data_dir in base_dir.glob('data-*'):
-        if data_dir.is_dir():
-            logger.info(f"Scanning directory: {data_dir}")
+    # Look in all data directories. os.scandir reuses the directory entry type,
+    # so no extra stat call is needed per case directory
+    with os.scandir(base_dir) as data_entries:
+        for data_entry in data_entries:
+            if not data_entry.name.startswith('data-') or not data_entry.is_dir():
+                continue
+            logger.info(f"Scanning directory: {data_entry.path}")
             
             # Find all court case directories
-            for case_dir in data_dir.iterdir():
-                if case_dir.is_dir():
-                    document_file = case_dir / filename
-                    if document_file.exists():
-                        document_files.append(document_file)
+            with os.scandir(data_entry.path) as case_entries:
+                for case_entry in case_entries:
+                    if case_entry.is_dir():
+                        document_file = os.path.join(case_entry.path, filename)
+                        if os.path.isfile(document_file):
+                            document_files.append(Path(document_file))
                         
     logger.info(f"Found {len(document_files)} {filename} files")
     return document_files
 
+def write_output_file(output_file: Path, data: bytes):
+    """Write data to output_file with plain os.write calls, no Python file object is created."""
+    fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        # os.write may write less than asked for, e.g. for very large outputs
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def copy_validation_file(case_id: str, file_path: Path, output_file: Path) -> bool:
+    """Copy a validation document unchanged. Returns False if it could not be copied."""
+    try:
+        # The validation documents are kept unchanged, so write the original bytes back
+        # instead of re-serializing them; parsing only rejects corrupt documents
+        original_bytes = file_path.read_bytes()
+        orjson.loads(original_bytes)
+        write_output_file(output_file, original_bytes)
+        return True
+    except Exception as e:
+        logger.error(f"Error copying validation file for {case_id}: {str(e)}")
+        return False
+
 def extract_case_id_from_path(file_path: Path) -> str:
     """Extract case ID from the file path."""
     return file_path.parent.name
 
+def build_pending_jobs(file_paths: List[Path], output_dir: Path, split_name: str) -> List[Tuple[str, Path, Path]]:
+    """Return (case_id, file_path, output_file) for the files without an output yet."""
+    # List the output directory once instead of checking every output file on disk
+    existing = set(os.listdir(output_dir))
+    jobs = []
+    for file_path in file_paths:
+        case_id = extract_case_id_from_path(file_path)
+        output_name = f"{case_id}.json"
+        if output_name not in existing:
+            jobs.append((case_id, file_path, output_dir / output_name))
+    
+    skipped = len(file_paths) - len(jobs)
+    if skipped:
+        logger.info(f"Skipping {skipped} {split_name} files - already exist")
+    return jobs
+
 def main():
     parser = argparse.ArgumentParser(description='Process legal document JSON files and create datasets')
     parser.add_argument('--type', choices=['subpoena', 'counterclaim'], default='subpoena',
                        help='Document type to process (default: subpoena)')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                       help='Number of worker processes (default: number of CPUs - 1)')
     
     args = parser.parse_args()
     doc_type = args.type
@@ -252,55 +285,44 @@ def main():
     validation_processed = 0
     train_processed = 0
     
+    # Already processed files are only dropped after the split, so re-runs keep the
+    # same train/validation split as the first run
     logger.info("Copying original JSON files for validation dataset...")
-    for file_path in validation_files:
-        case_id = extract_case_id_from_path(file_path)
-        output_file = validation_output_dir / f"{case_id}.json"
-        
-        if output_file.exists():
-            logger.debug(f"Skipping validation {case_id} - already exists")
-            continue
-            
-        try:
-            with open(file_path, 'r', encoding='utf-8') as source:
-                original_data = json.load(source)
-            
-            with open(output_file, 'w', encoding='utf-8') as target:
-                json.dump(original_data, target, indent=2, ensure_ascii=False)
-                
-            validation_processed += 1
-            processed_count += 1
-                    
-        except Exception as e:
-            logger.error(f"Error copying validation file for {case_id}: {str(e)}")
-            error_count += 1
+    validation_jobs = build_pending_jobs(validation_files, validation_output_dir, 'validation')
     
-    logger.info("Processing training files...")
-    for file_path in train_files:
-        case_id = extract_case_id_from_path(file_path)
-        output_file = train_output_dir / f"{case_id}.json"
-        
-        if output_file.exists():
-            logger.debug(f"Skipping training {case_id} - already exists")
-            continue
-            
-        result = process_document_file(file_path)
-        
-        if result is not None:
-            try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, indent=2, ensure_ascii=False)
-                train_processed += 1
+    # Copying is IO bound, so threads are enough here
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        copied = executor.map(lambda job: copy_validation_file(*job), validation_jobs)
+        for ok in copied:
+            if ok:
+                validation_processed += 1
                 processed_count += 1
-                
-                if processed_count % 100 == 0:
-                    logger.info(f"Processed {processed_count} files total ({train_processed} train, {validation_processed} validation)...")
+            else:
+                error_count += 1
+    
+    logger.info("Processing training files...")
+    train_jobs = build_pending_jobs(train_files, train_output_dir, 'training')
+    
+    # Parsing and categorizing the words is CPU bound, so spread the files over processes;
+    # the results are written from this process as they come back, in input order
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        results = executor.map(process_document_file, [file_path for _, file_path, _ in train_jobs], chunksize=32)
+        for (case_id, _, output_file), result in zip(train_jobs, results):
+            if result is not None:
+                try:
+                    # Compact output, the files are only read back by create_sharegpt.py
+                    write_output_file(output_file, orjson.dumps(result))
+                    train_processed += 1
+                    processed_count += 1
                     
-            except Exception as e:
-                logger.error(f"Error saving training result for {case_id}: {str(e)}")
+                    if processed_count % 100 == 0:
+                        logger.info(f"Processed {processed_count} files total ({train_processed} train, {validation_processed} validation)...")
+                        
+                except Exception as e:
+                    logger.error(f"Error saving training result for {case_id}: {str(e)}")
+                    error_count += 1
+            else:
                 error_count += 1
-        else:
-            error_count += 1
     
     logger.info("="*50)
     logger.info("Dataset creation completed!")
@@ -1,23 +1,9 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from functools import lru_cache
+import importlib
 import asyncio
 import os
-from openai import OpenAI, AsyncOpenAI
-from doc_types.subpoena import (
-    get_subpoena_annotation_prompts, 
-    get_subpoena_summary_prompts,
-    get_subpoena_annotation_model_config, 
-    get_subpoena_summary_model_config,
-    get_subpoena_annotation_system_prompt,
-    get_subpoena_summary_system_prompt
-)
-from doc_types.counterclaim import (
-    get_counterclaim_annotation_prompts,
-    get_counterclaim_summary_prompts,
-    get_counterclaim_annotation_model_config,
-    get_counterclaim_summary_model_config,
-    get_counterclaim_annotation_system_prompt,
-    get_counterclaim_summary_system_prompt
-)
+from openai import OpenAI, AsyncOpenAI, APITimeoutError
 
 # Supported document types
 SUPPORTED_DOCUMENT_TYPES = {
@@ -28,46 +14,28 @@ SUPPORTED_DOCUMENT_TYPES = {
 # Task types
 TASK_TYPES = ["annotation", "summary"]
 
-ANNOTATION_PROMPTS = {
-    "subpoena": get_subpoena_annotation_prompts(),
-    "counterclaim": get_counterclaim_annotation_prompts()
-}
-
-SUMMARY_PROMPTS = {
-    "subpoena": get_subpoena_summary_prompts(),
-    "counterclaim": get_counterclaim_summary_prompts()
-}
-
-ANNOTATION_MODEL_CONFIGS = {
-    "subpoena": get_subpoena_annotation_model_config(),
-    "counterclaim": get_counterclaim_annotation_model_config()
-}
-
-SUMMARY_MODEL_CONFIGS = {
-    "subpoena": get_subpoena_summary_model_config(),
-    "counterclaim": get_counterclaim_summary_model_config()
-}
+# Word level annotation categories, in the order they are processed and reported
+ANNOTATION_CATEGORIES = ('isTemei', 'isProba', 'isSelected', 'isCerere', 'isReclamant', 'isParat')
 
-ANNOTATION_SYSTEM_PROMPTS = {
-    "subpoena": get_subpoena_annotation_system_prompt(),
-    "counterclaim": get_counterclaim_annotation_system_prompt()
-}
+# Tags delimiting the paragraphs in the document text sent to the models
+PARAGRAPH_OPEN = '<p>'
+PARAGRAPH_CLOSE = '</p>'
 
-SUMMARY_SYSTEM_PROMPTS = {
-    "subpoena": get_subpoena_summary_system_prompt(),
-    "counterclaim": get_counterclaim_summary_system_prompt()
+# Modules in doc_types implementing each document type. A module is only imported the
+# first time its document type is used, see _load_document_type_config
+DOCUMENT_TYPE_MODULES = {
+    "subpoena": "doc_types.subpoena",
+    "counterclaim": "doc_types.counterclaim"
 }
 
-# Backwards compatibility
-REQUEST_PROMPTS = ANNOTATION_PROMPTS
-MODEL_CONFIGS = ANNOTATION_MODEL_CONFIGS
-SYSTEM_PROMPTS = ANNOTATION_SYSTEM_PROMPTS
-
 # Get VLLM endpoint from environment variable, default to localhost:9020
 VLLM_ENDPOINT = os.getenv("VLLM_ENDPOINT", "http://localhost:9020/v1")
 
 VLLM_TIMEOUT = int(os.getenv("VLLM_TIMEOUT", "500"))  # 8.3 minutes default
 
+# Retries of transient failures (connection errors, 429, 5xx), all within VLLM_TIMEOUT
+VLLM_MAX_RETRIES = int(os.getenv("VLLM_MAX_RETRIES", "2"))
+
 # Keep the sync client for backwards compatibility
 client = OpenAI(
     base_url=VLLM_ENDPOINT,
@@ -78,34 +46,34 @@ client = OpenAI(
 async_client = AsyncOpenAI(
     base_url=VLLM_ENDPOINT,
     api_key="EMPTY",
-    timeout=VLLM_TIMEOUT
+    timeout=VLLM_TIMEOUT,
+    max_retries=VLLM_MAX_RETRIES
 )
 
+@lru_cache(maxsize=None)
+def _load_document_type_config(document_type: str, task_type: str) -> Tuple[dict, dict, str]:
+    """Load the prompts, model config and system prompt of a document type and task type.
+    The doc_types module is imported on first use and the result is cached."""
+    if task_type not in TASK_TYPES:
+        raise ValueError(f"Unsupported task type: {task_type}. Supported types: {TASK_TYPES}")
+    if document_type not in DOCUMENT_TYPE_MODULES:
+        raise ValueError(f"Unsupported document type: {document_type}. Supported types: {list(DOCUMENT_TYPE_MODULES.keys())}")
+    
+    module = importlib.import_module(DOCUMENT_TYPE_MODULES[document_type])
+    prefix = f"get_{document_type}_{task_type}"
+    return (
+        getattr(module, f"{prefix}_prompts")(),
+        getattr(module, f"{prefix}_model_config")(),
+        getattr(module, f"{prefix}_system_prompt")()
+    )
+
 def get_prompts_for_task_type(document_type: str, task_type: str) -> dict:
     """Get prompts for a specific document type and task type"""
-    if task_type == "annotation":
-        if document_type not in ANNOTATION_PROMPTS:
-            raise ValueError(f"Unsupported document type: {document_type}. Supported types: {list(ANNOTATION_PROMPTS.keys())}")
-        return ANNOTATION_PROMPTS[document_type]
-    elif task_type == "summary":
-        if document_type not in SUMMARY_PROMPTS:
-            raise ValueError(f"Unsupported document type: {document_type}. Supported types: {list(SUMMARY_PROMPTS.keys())}")
-        return SUMMARY_PROMPTS[document_type]
-    else:
-        raise ValueError(f"Unsupported task type: {task_type}. Supported types: {TASK_TYPES}")
+    return _load_document_type_config(document_type, task_type)[0]
 
 def get_model_for_task_type(document_type: str, annotation_type: str, task_type: str) -> str:
     """Get model name for a specific document type, annotation type, and task type"""
-    if task_type == "annotation":
-        if document_type not in ANNOTATION_MODEL_CONFIGS:
-            raise ValueError(f"Unsupported document type: {document_type}. Supported types: {list(ANNOTATION_MODEL_CONFIGS.keys())}")
-        model_config = ANNOTATION_MODEL_CONFIGS[document_type]
-    elif task_type == "summary":
-        if document_type not in SUMMARY_MODEL_CONFIGS:
-            raise ValueError(f"Unsupported document type: {document_type}. Supported types: {list(SUMMARY_MODEL_CONFIGS.keys())}")
-        model_config = SUMMARY_MODEL_CONFIGS[document_type]
-    else:
-        raise ValueError(f"Unsupported task type: {task_type}. Supported types: {TASK_TYPES}")
+    model_config = _load_document_type_config(document_type, task_type)[1]
     
     if annotation_type not in model_config:
         raise ValueError(f"Unknown annotation type '{annotation_type}' for document type '{document_type}' and task type '{task_type}'. Available types: {list(model_config.keys())}")
@@ -114,39 +82,45 @@ def get_model_for_task_type(document_type: str, annotation_type: str, task_type:
 
 def get_system_prompt_for_task_type(document_type: str, task_type: str) -> str:
     """Get system prompt for a specific document type and task type"""
-    if task_type == "annotation":
-        if document_type not in ANNOTATION_SYSTEM_PROMPTS:
-            raise ValueError(f"Unsupported document type: {document_type}. Supported types: {list(ANNOTATION_SYSTEM_PROMPTS.keys())}")
-        return ANNOTATION_SYSTEM_PROMPTS[document_type]
-    elif task_type == "summary":
-        if document_type not in SUMMARY_SYSTEM_PROMPTS:
-            raise ValueError(f"Unsupported document type: {document_type}. Supported types: {list(SUMMARY_SYSTEM_PROMPTS.keys())}")
-        return SUMMARY_SYSTEM_PROMPTS[document_type]
-    else:
-        raise ValueError(f"Unsupported task type: {task_type}. Supported types: {TASK_TYPES}")
+    return _load_document_type_config(document_type, task_type)[2]
 
 def extract_combined_text(document):
     """Extract and combine text content from the list of words of a document.
     Append <p> tags for each paragraph."""
-    paragraph_texts = []
+    # The tags and words go into one flat token list that is joined once, instead of
+    # formatting a string per paragraph and joining those again
+    tokens = []
     
     for page in document.pages:
         for paragraph in page.paragraphs:
-            paragraph_words = []
+            start = len(tokens)
+            tokens.append(PARAGRAPH_OPEN)
             for word in paragraph.words:
                 word_text = word.text
 
                 if not word_text:
                     continue
 
-                paragraph_words.append(word_text)
+                tokens.append(word_text)
             
-            if paragraph_words:
-                paragraph_content = ' '.join(paragraph_words)
-                paragraph_texts.append(f"<p> {paragraph_content} </p>")
+            if len(tokens) == start + 1:
+                # Paragraph without words, drop its opening tag
+                tokens.pop()
+            else:
+                tokens.append(PARAGRAPH_CLOSE)
     
-    return ' '.join(paragraph_texts)
+    return ' '.join(tokens)
+
+
+def build_document_section(document_text: str) -> str:
+    """Document part of the user prompt, followed by the request header. Shared by the
+    inference and training prompts, so both always use the same layout."""
+    return f"""## Document Text
+
+{document_text}
 
+## Request
+"""
 
 def build_user_prompt_for_task_type(document_text: str, annotation_type: str, task_type: str, document_type: str = "subpoena", additional_context: Dict[str, str] = None) -> str:
     """Build user prompt for LLM based on document text, annotation type, task type and document type"""
@@ -165,15 +139,23 @@ def build_user_prompt_for_task_type(document_text: str, annotation_type: str, ta
             # If formatting fails, use original template
             pass
     
-    return f"""## Document Text
-
-{document_text}
+    return build_document_section(document_text) + prompt_template
 
-## Request
-{prompt_template}"""
+def build_user_prompts_for_categories(document_text: str, annotation_types: List[str], task_type: str, document_type: str = "subpoena") -> Dict[str, str]:
+    """Build the user prompts of several annotation types for the same document text.
+    The document part of the prompt is built once and shared by all of them."""
+    prompts = get_prompts_for_task_type(document_type, task_type)
+    
+    unknown_types = [annotation_type for annotation_type in annotation_types if annotation_type not in prompts]
+    if unknown_types:
+        raise ValueError(f"Unknown annotation types {unknown_types} for document type '{document_type}' and task type '{task_type}'. Available types: {list(prompts.keys())}")
+    
+    document_section = build_document_section(document_text)
+    return {annotation_type: document_section + prompts[annotation_type] for annotation_type in annotation_types}
 
 async def make_openai_request_async(model: str, messages: List[Dict], temperature: float, max_tokens):
-    """Async wrapper for OpenAI API calls with proper timeout handling"""
+    """Async wrapper for OpenAI API calls with proper timeout handling. The client retries
+    transient failures, the overall deadline keeps the call with its retries within VLLM_TIMEOUT."""
     try:
         completion = await asyncio.wait_for(
             async_client.chat.completions.create(
@@ -185,7 +167,7 @@ async def make_openai_request_async(model: str, messages: List[Dict], temperatur
             timeout=VLLM_TIMEOUT
         )
         return completion
-    except asyncio.TimeoutError:
+    except (asyncio.TimeoutError, APITimeoutError):
         raise Exception(f"Request to VLLM endpoint timed out after {VLLM_TIMEOUT} seconds")
     except Exception as e:
         raise Exception(f"VLLM request failed: {str(e)}")
\ No newline at end of file